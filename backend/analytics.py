@@ -0,0 +1,127 @@
+"""Batch analytics over every archived patch version (change heat-map, STR-03)."""
+import os
+
+import numpy as np
+
+from . import utils
+
+_DIRECTIONS = ("buff", "nerf", "adjustment")
+# Intensity contributed by a change without usable numbers (e.g. "Removed", text-only values)
+ADJUSTMENT_WEIGHT = 0.25
+_ROW_SEP = "\x1f"
+
+# Per-version columns: version -> (mtime, sections, entities, direction codes, before, after)
+_COLUMN_CACHE: dict[str, tuple] = {}
+# Assembled heat-maps keyed by (version signature, section, window)
+_HEATMAP_CACHE: dict[tuple, dict] = {}
+_HEATMAP_CACHE_MAX = 32
+
+
+def _version_columns(patch_version: str) -> tuple:
+    """Load one version's change records as flat NumPy columns, reusing the cache while the file is unchanged."""
+    mtime = os.path.getmtime(f'patch-{patch_version}.html')
+    cached = _COLUMN_CACHE.get(patch_version)
+    if cached and cached[0] == mtime:
+        return cached
+
+    records = utils.get_change_records(patch_version)
+    sections = np.array([r.section for r in records], dtype=object)
+    entities = np.array([r.entity for r in records], dtype=object)
+    directions = np.array([_DIRECTIONS.index(r.direction) for r in records], dtype=np.int8)
+    before = np.array([np.nan if r.before is None else r.before for r in records], dtype=np.float64)
+    after = np.array([np.nan if r.after is None else r.after for r in records], dtype=np.float64)
+
+    cached = (mtime, sections, entities, directions, before, after)
+    _COLUMN_CACHE[patch_version] = cached
+    return cached
+
+
+def forget_version(patch_version: str):
+    """Drop a version's columns and every assembled heat-map."""
+    _COLUMN_CACHE.pop(patch_version, None)
+    _HEATMAP_CACHE.clear()
+
+
+def _magnitudes(before: np.ndarray, after: np.ndarray) -> np.ndarray:
+    """Relative size of each change, clipped to [0, 1]; non-numeric changes get ADJUSTMENT_WEIGHT."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rel = np.abs(after - before) / np.abs(before)
+    rel = np.where(np.isfinite(rel), rel, 1.0)
+    rel = np.clip(rel, 0.0, 1.0)
+    return np.where(np.isnan(before) | np.isnan(after), ADJUSTMENT_WEIGHT, rel)
+
+
+def _rolling_sum(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Trailing rolling sum along the version axis."""
+    csum = np.cumsum(matrix, axis=1)
+    if window < matrix.shape[1]:
+        csum[:, window:] = csum[:, window:] - csum[:, :-window]
+    return csum
+
+
+def build_heatmap(from_version: str | None = None, to_version: str | None = None,
+                  section: str | None = None, window: int = 3) -> dict:
+    """Build the entity x version change matrix for archived versions in [from_version, to_version].
+
+    Rows are (section, entity) pairs, listed in parallel "sections" / "entities" arrays.
+    Returns buff/nerf counts, an intensity score (sum of relative change sizes) and its trailing
+    rolling sum per entity, plus the total intensity per patch.
+    """
+    lo = utils.version_key(from_version) if from_version else None
+    hi = utils.version_key(to_version) if to_version else None
+    versions = [
+        v for v in utils.list_archived_versions()
+        if (lo is None or utils.version_key(v) >= lo) and (hi is None or utils.version_key(v) <= hi)
+    ]
+    window = max(1, int(window))
+
+    columns = [_version_columns(v) for v in versions]
+    key = (tuple((v, c[0]) for v, c in zip(versions, columns)), section, window)
+    if key in _HEATMAP_CACHE:
+        return _HEATMAP_CACHE[key]
+
+    lengths = np.array([len(c[2]) for c in columns], dtype=np.intp)
+    if lengths.sum():
+        sections = np.concatenate([c[1] for c in columns])
+        entities = np.concatenate([c[2] for c in columns])
+        directions = np.concatenate([c[3] for c in columns])
+        before = np.concatenate([c[4] for c in columns])
+        after = np.concatenate([c[5] for c in columns])
+        version_idx = np.repeat(np.arange(len(versions)), lengths)
+        if section:
+            keep = sections == section
+            sections, entities, directions = sections[keep], entities[keep], directions[keep]
+            before, after, version_idx = before[keep], after[keep], version_idx[keep]
+        # Rows are (section, entity): the same champion in "champions" and an ARAM or Arena
+        # section is a separate row, not one row mixing both modes' changes
+        row_keys = np.char.add(np.char.add(sections.astype(str), _ROW_SEP), entities.astype(str))
+        keys, entity_idx = np.unique(row_keys, return_inverse=True)
+        rows = [k.split(_ROW_SEP, 1) for k in keys.tolist()]
+    else:
+        rows = []
+        entity_idx = version_idx = directions = np.array([], dtype=np.intp)
+        before = after = np.array([], dtype=np.float64)
+
+    shape = (len(rows), len(versions))
+    buffs = np.zeros(shape, dtype=np.int32)
+    nerfs = np.zeros(shape, dtype=np.int32)
+    intensity = np.zeros(shape, dtype=np.float64)
+    np.add.at(buffs, (entity_idx[directions == 0], version_idx[directions == 0]), 1)
+    np.add.at(nerfs, (entity_idx[directions == 1], version_idx[directions == 1]), 1)
+    np.add.at(intensity, (entity_idx, version_idx), _magnitudes(before, after))
+
+    heatmap = {
+        "versions": versions,
+        "sections": [sec for sec, _ in rows],
+        "entities": [name for _, name in rows],
+        "buffs": buffs.tolist(),
+        "nerfs": nerfs.tolist(),
+        "intensity": np.round(intensity, 3).tolist(),
+        "rolling_intensity": np.round(_rolling_sum(intensity, window), 3).tolist(),
+        "patch_intensity": np.round(intensity.sum(axis=0), 3).tolist(),
+        "window": window,
+    }
+    if len(_HEATMAP_CACHE) >= _HEATMAP_CACHE_MAX:
+        _HEATMAP_CACHE.clear()
+    _HEATMAP_CACHE[key] = heatmap
+    return heatmap
@@ -0,0 +1,129 @@
+"""Populate the archive with past patches: page through the index, download and parse in parallel.
+
+Usage (from the repository root):
+
+    python -m backend.backfill --archive backend --limit 48 --out dist/api
+
+Downloads run on a bounded thread pool, parsing on a process pool across CPU cores.
+Versions already downloaded and exported with an unchanged source hash are skipped,
+so an interrupted run can simply be started again.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import requests
+
+from . import export, utils
+
+MAX_INDEX_PAGES = 40
+
+
+def index_page_url(page: int) -> str:
+    return utils.PATCH_NOTES_URL if page <= 1 else f"{utils.PATCH_NOTES_URL}?page={page}"
+
+
+def enumerate_versions(limit: int, since: str | None = None, max_pages: int = MAX_INDEX_PAGES) -> list[str]:
+    """Walk the paginated patch-notes index newest-first until `limit` versions or `since` is reached."""
+    since_key = utils.version_key(since) if since else None
+    versions: list[str] = []
+    for page in range(1, max_pages + 1):
+        try:
+            r = requests.get(index_page_url(page), timeout=20)
+            r.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"Stopping index walk at page {page}: {e}")
+            break
+
+        new = [v for v in utils.extract_index_versions(r.text) if v not in versions]
+        if not new:
+            break  # past the last page (or the site ignores ?page=)
+        for v in new:
+            if since_key is not None and utils.version_key(v) < since_key:
+                return versions
+            versions.append(v)
+            if len(versions) >= limit:
+                return versions
+    return versions
+
+
+def _download(patch_version: str) -> int:
+    """Fetch one article unless it is already archived; returns bytes written."""
+    filename = f'patch-{patch_version}.html'
+    if os.path.exists(filename):
+        return 0
+    utils.get_patch(patch_version)
+    return os.path.getsize(filename)
+
+
+def backfill(versions: list[str], out_dir: str, concurrency: int = 8, workers: int | None = None) -> dict:
+    """Download missing versions, parse stale ones in parallel and write them to the export store."""
+    t0 = time.perf_counter()
+    downloaded, failed, nbytes = [], [], 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {v: pool.submit(_download, v) for v in versions}
+        for v, fut in futures.items():
+            try:
+                size = fut.result()
+            except Exception as e:
+                print(f"Failed to download {v}: {e}")
+                failed.append(v)
+                continue
+            if size:
+                downloaded.append(v)
+                nbytes += size
+    t1 = time.perf_counter()
+
+    manifest = export.load_manifest(out_dir)
+    archived = [v for v in versions if v not in failed]
+    stale = export.stale_versions(manifest, archived)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for v, (bundle, rows) in zip(stale, pool.map(utils.build_bundle, stale)):
+            utils.store_bundle(v, bundle, rows)
+            export.export_version(out_dir, v)
+            manifest["versions"][v] = stale[v]
+            export.save_manifest(out_dir, manifest)  # persist per version so an interrupted run resumes
+    t2 = time.perf_counter()
+
+    export.write_aliases(out_dir, utils.list_archived_versions())
+
+    stats = {
+        "downloaded": len(downloaded),
+        "parsed": len(stale),
+        "skipped": len(archived) - len(stale),
+        "failed": failed,
+        "download_seconds": round(t1 - t0, 2),
+        "download_mb_per_s": round(nbytes / 1e6 / max(t1 - t0, 1e-9), 2),
+        "parse_seconds": round(t2 - t1, 2),
+        "parse_versions_per_s": round(len(stale) / max(t2 - t1, 1e-9), 2),
+    }
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill the patch archive from Riot's patch-notes index.")
+    parser.add_argument("--archive", default=".", help="directory holding the patch-*.html files (default: cwd)")
+    parser.add_argument("--out", default="dist/api", help="export store directory (default: dist/api)")
+    parser.add_argument("--limit", type=int, default=48, help="number of most recent versions (default: 48, ~2 years)")
+    parser.add_argument("--since", help="oldest version to include, e.g. 24-1")
+    parser.add_argument("--versions", nargs="*", help="explicit versions instead of walking the index")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel downloads (default: 8)")
+    parser.add_argument("--workers", type=int, default=None, help="parse processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    out_dir = os.path.abspath(args.out)
+    os.chdir(args.archive)
+    versions = args.versions or enumerate_versions(args.limit, since=args.since)
+    print(f"Backfilling {len(versions)} version(s)")
+
+    stats = backfill(versions, out_dir, concurrency=args.concurrency, workers=args.workers)
+    print(
+        f"Downloaded {stats['downloaded']} in {stats['download_seconds']}s ({stats['download_mb_per_s']} MB/s); "
+        f"parsed {stats['parsed']} in {stats['parse_seconds']}s ({stats['parse_versions_per_s']} versions/s); "
+        f"skipped {stats['skipped']}, failed {len(stats['failed'])}"
+    )
+
+
+if __name__ == "__main__":
+    main()
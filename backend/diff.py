@@ -0,0 +1,139 @@
+"""Net changes between two patch versions, built from the per-version parsed bundles.
+
+Only archived versions are used; populating the archive is left to the backfill command.
+"""
+import threading
+from collections import OrderedDict
+
+from . import utils
+
+# Widest span a single request may diff (about two years of patches)
+MAX_DIFF_VERSIONS = 48
+DIFF_CACHE_MAX = 128
+
+# (from, to) -> (versions used, diff), least recently used first; the version list guards
+# against a grown archive
+_DIFF_CACHE: OrderedDict[tuple[str, str], tuple[tuple, dict]] = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _gaps(from_version: str, to_version: str, archived: list[str]) -> list[str]:
+    """Versions that should exist in the span but are not archived.
+
+    Within one season patch numbers are consecutive, so holes between neighbouring known
+    versions are gaps; an unarchived to_version is missing too.
+    """
+    known = sorted({from_version, to_version, *archived}, key=utils.version_key)
+    missing = []
+    for a, b in zip(known, known[1:]):
+        ka, kb = utils.version_key(a), utils.version_key(b)
+        if len(ka) == len(kb) == 2 and ka[0] == kb[0]:
+            if kb[1] - ka[1] > MAX_DIFF_VERSIONS:
+                raise ValueError(f"a diff may span at most {MAX_DIFF_VERSIONS} versions")
+            missing += [f"{ka[0]}-{minor}" for minor in range(ka[1] + 1, kb[1])]
+    if to_version not in archived:
+        missing.append(to_version)
+    return missing
+
+
+def versions_between(from_version: str, to_version: str) -> tuple[list[str], list[str]]:
+    """Archived versions after from_version up to and including to_version, oldest first,
+    plus the versions missing from the archive in that span.
+
+    Raises ValueError when the span is wider than MAX_DIFF_VERSIONS.
+    """
+    lo, hi = utils.version_key(from_version), utils.version_key(to_version)
+    versions = [v for v in utils.list_archived_versions() if lo < utils.version_key(v) <= hi]
+    missing = _gaps(from_version, to_version, versions)
+    if len(versions) + len(missing) > MAX_DIFF_VERSIONS:
+        raise ValueError(f"a diff may span at most {MAX_DIFF_VERSIONS} versions")
+    return versions, missing
+
+
+def cached_diff(from_version: str, to_version: str, versions: list[str]) -> dict | None:
+    """Memoized diff for a span, if it was built from the same archived versions."""
+    with _CACHE_LOCK:
+        cached = _DIFF_CACHE.get((from_version, to_version))
+        if cached and cached[0] == tuple(versions):
+            _DIFF_CACHE.move_to_end((from_version, to_version))
+            return cached[1]
+    return None
+
+
+def _net_records(records) -> list[dict]:
+    """Collapse a sequence of ChangeRecords into first-before -> last-after per (ability, stat)."""
+    net: dict[tuple, dict] = {}
+    for version, r in records:
+        key = (r.ability, r.stat)
+        if key not in net:
+            net[key] = {"ability": r.ability, "stat": r.stat, "before": r.before, "unit": r.unit}
+        net[key].update(after=r.after, unit=r.unit or net[key]["unit"], version=version)
+    for entry in net.values():
+        entry["direction"] = utils.change_direction(entry["stat"], entry["before"], entry["after"])
+    return list(net.values())
+
+
+def _track(target: dict, name: str, version: str, change):
+    entry = target.setdefault(name, {"latest": None, "latest_version": None, "history": []})
+    entry["history"].append({"version": version, "change": change})
+    entry["latest"] = change
+    entry["latest_version"] = version
+    return entry
+
+
+def build_diff(from_version: str, to_version: str, span: tuple[list[str], list[str]] | None = None) -> dict:
+    """Entities touched between two versions with their latest state, change history and net numeric changes.
+
+    `span` is a precomputed versions_between() result, so a request resolves it only once.
+    """
+    versions, missing = span or versions_between(from_version, to_version)
+    cached = cached_diff(from_version, to_version, versions)
+    if cached is not None:
+        return cached
+
+    champions: dict[str, dict] = {}
+    items: dict[str, dict] = {}
+    other: dict[str, dict] = {}
+    # Keyed by (section, entity): mode sections (ARAM, Arena) name champions too
+    records: dict[tuple[str, str], list] = {}
+
+    for v in versions:
+        bundle = utils.get_bundle(v)
+        for name, summary in bundle.get("champions", {}).items():
+            _track(champions, name, v, summary)
+        for name, bullets in bundle.get("items", {}).items():
+            _track(items, name, v, bullets)
+        for section, entries in bundle.get("other", {}).items():
+            if not isinstance(entries, dict):
+                entries = {section: entries}
+            for title, entry in entries.items():
+                _track(other.setdefault(section, {}), title, v, entry)
+        for r in utils.get_change_records(v):
+            records.setdefault((r.section, r.entity), []).append((v, r))
+
+    for section, target in (("champions", champions), ("items", items)):
+        for name, entry in target.items():
+            entry["net"] = _net_records(records.get((section, name), ()))
+
+    diff = {
+        "from": from_version,
+        "to": to_version,
+        "versions": versions,
+        "missing": missing,
+        "champions": champions,
+        "items": items,
+        "other": other,
+    }
+    with _CACHE_LOCK:
+        _DIFF_CACHE[(from_version, to_version)] = (tuple(versions), diff)
+        while len(_DIFF_CACHE) > DIFF_CACHE_MAX:
+            _DIFF_CACHE.popitem(last=False)
+    return diff
+
+
+def forget_version(patch_version: str):
+    """Drop memoized diffs that include a version."""
+    with _CACHE_LOCK:
+        for key, (versions, _) in list(_DIFF_CACHE.items()):
+            if patch_version in versions:
+                _DIFF_CACHE.pop(key, None)
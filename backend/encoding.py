@@ -0,0 +1,105 @@
+"""Content negotiation for the data endpoints: JSON, MessagePack and (optionally) CBOR.
+
+Encoded bytes are cached per (version, resource, format) next to the parsed bundle, so
+each format is encoded once per version instead of once per request. The cache is an
+LRU bounded by ENCODED_CACHE_MAX entries.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from fastapi import Request, Response
+
+try:
+    import msgpack
+except ImportError:  # optional: MessagePack is only offered when installed
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # optional: CBOR is only offered when installed
+    cbor2 = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CBOR = "application/cbor"
+
+# Accept values we understand -> canonical media type
+_ALIASES = {
+    JSON: JSON,
+    "application/*": JSON,
+    "*/*": JSON,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    CBOR: CBOR,
+}
+
+# (version, resource, ..., media type) -> encoded body, least recently used first
+_ENCODED_CACHE: OrderedDict[tuple, bytes] = OrderedDict()
+ENCODED_CACHE_MAX = int(os.getenv("ENCODED_CACHE_MAX", "1024"))
+_CACHE_LOCK = threading.Lock()
+
+
+def encode_json(payload) -> bytes:
+    """Serialize exactly like FastAPI's JSONResponse."""
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _encoders() -> dict:
+    encoders = {JSON: encode_json}
+    if msgpack is not None:
+        encoders[MSGPACK] = lambda payload: msgpack.packb(payload, use_bin_type=True)
+    if cbor2 is not None:
+        encoders[CBOR] = cbor2.dumps
+    return encoders
+
+
+def negotiate(accept: str | None) -> str:
+    """Pick the supported media type with the highest q-value from an Accept header; JSON otherwise."""
+    if not accept:
+        return JSON
+    available = _encoders()
+    best, best_q = JSON, -1.0
+    for part in accept.split(','):
+        media, *params = [p.strip() for p in part.split(';')]
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        media = _ALIASES.get(media.lower())
+        if media in available and q > best_q and q > 0:
+            best, best_q = media, q
+    return best
+
+
+def respond(request: Request, payload, cache_key: tuple | None = None) -> Response:
+    """Encode a payload in the client's preferred format, reusing cached bytes for versioned resources."""
+    media_type = negotiate(request.headers.get("accept"))
+    # Only cache resources tied to a concrete version (the first key element)
+    key = (*cache_key, media_type) if cache_key and cache_key[0] else None
+    body = None
+    if key:
+        with _CACHE_LOCK:
+            body = _ENCODED_CACHE.get(key)
+            if body is not None:
+                _ENCODED_CACHE.move_to_end(key)
+    if body is None:
+        body = _encoders()[media_type](payload)
+        if key:
+            with _CACHE_LOCK:
+                _ENCODED_CACHE[key] = body
+                while len(_ENCODED_CACHE) > ENCODED_CACHE_MAX:
+                    _ENCODED_CACHE.popitem(last=False)
+    return Response(content=body, media_type=media_type, headers={"Vary": "Accept"})
+
+
+def forget_version(patch_version: str):
+    """Drop every encoded response for a version."""
+    with _CACHE_LOCK:
+        for key in [k for k in _ENCODED_CACHE if k[0] == patch_version]:
+            _ENCODED_CACHE.pop(key, None)
@@ -0,0 +1,150 @@
+"""Pre-render the read endpoints for every archived version into a static JSON tree.
+
+Usage (from the repository root):
+
+    python -m backend.export --archive backend --out dist/api
+
+Files mirror the API paths so nginx or a CDN can serve them directly, e.g.
+`/bundle/25-16` -> `bundle/25-16.json` and `/bundle/` -> `bundle/index.json`,
+each with `.gz` (and `.br` when brotli is installed) siblings. Cached hero images are
+copied to `highlights/<v>/image/<file>` and the exported highlights point there. Only versions
+whose source HTML hash changed since the last run are re-rendered.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip siblings are written without it
+    brotli = None
+
+from . import images, utils
+from .encoding import encode_json
+
+MANIFEST = "manifest.json"
+RECENT_VERSIONS = 3  # matches /versions/
+
+# endpoint directory -> payload built from the parsed bundle (same shape as the API response)
+ENDPOINTS = {
+    "bundle": lambda v, b: b,
+    "champions": lambda v, b: {"champions": b.get("champions", {})},
+    "items": lambda v, b: {"items": b.get("items", {})},
+    "other": lambda v, b: b.get("other", {}),
+    "arena": lambda v, b: b.get("arena", {"arena": {}, "mentions": []}),
+    "tagline": lambda v, b: {"tagline": b.get("tagline")},
+    "highlights": lambda v, b: {"highlights": b.get("highlights", {"image": None, "alt": "", "caption": ""})},
+    "changes": lambda v, b: utils.get_changes(v),
+}
+
+
+def source_hash(patch_version: str) -> str:
+    with open(f'patch-{patch_version}.html', 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _write(path: str, data: bytes):
+    """Write a file with its pre-compressed siblings."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    variants = {path: data, f"{path}.gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[f"{path}.br"] = brotli.compress(data)
+    for target, content in variants.items():
+        tmp = f"{target}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(content)
+        os.replace(tmp, target)
+
+
+def _alias(out_dir: str, endpoint: str, patch_version: str):
+    """Point `<endpoint>/index.json` (the "latest" route) at an already rendered version."""
+    src = os.path.join(out_dir, endpoint, f"{patch_version}.json")
+    dst = os.path.join(out_dir, endpoint, "index.json")
+    for suffix in ("", ".gz", ".br"):
+        if os.path.exists(src + suffix):
+            shutil.copyfile(src + suffix, dst + suffix)
+
+
+def export_version(out_dir: str, patch_version: str):
+    """Render every endpoint of one version into out_dir."""
+    bundle = utils.get_bundle(patch_version)
+    if bundle.get("highlights"):
+        # Hero images are served from files in the tree instead of the API's image endpoint
+        bundle = {**bundle, "highlights": images.export_highlights(patch_version, bundle["highlights"], out_dir)}
+    for endpoint, render in ENDPOINTS.items():
+        _write(os.path.join(out_dir, endpoint, f"{patch_version}.json"), encode_json(render(patch_version, bundle)))
+
+
+def load_manifest(out_dir: str) -> dict:
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(manifest_path):
+        return {"versions": {}}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(out_dir: str, manifest: dict):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def stale_versions(manifest: dict, versions: list[str]) -> dict[str, str]:
+    """Return {version: source hash} for versions whose hash differs from the manifest."""
+    hashes = {v: source_hash(v) for v in versions}
+    return {v: h for v, h in hashes.items() if manifest["versions"].get(v) != h}
+
+
+def write_aliases(out_dir: str, versions: list[str]):
+    """Refresh the latest-version aliases and the version/versions lists."""
+    if not versions:
+        return
+    latest = versions[-1]
+    for endpoint in ENDPOINTS:
+        _alias(out_dir, endpoint, latest)
+    _write(os.path.join(out_dir, "version", "index.json"), encode_json({"version": latest}))
+    recent = list(reversed(versions))[:RECENT_VERSIONS]
+    _write(os.path.join(out_dir, "versions", "index.json"), encode_json({"versions": recent}))
+
+
+def export_all(out_dir: str, force: bool = False) -> dict:
+    """Render all archived versions whose source changed, then refresh the latest aliases and versions list."""
+    if brotli is None:
+        print("brotli is not installed; writing gzip siblings only (pip install brotli for .br files)")
+    manifest = load_manifest(out_dir)
+    versions = utils.list_archived_versions()
+    stale = {v: source_hash(v) for v in versions} if force else stale_versions(manifest, versions)
+
+    rendered, skipped = [], []
+    for v in versions:
+        if v not in stale:
+            skipped.append(v)
+            continue
+        utils.forget_version(v)
+        export_version(out_dir, v)
+        manifest["versions"][v] = stale[v]
+        rendered.append(v)
+
+    write_aliases(out_dir, versions)
+    save_manifest(out_dir, manifest)
+    return {"rendered": rendered, "skipped": skipped}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render patch-notes API responses to static files.")
+    parser.add_argument("--archive", default=".", help="directory holding the patch-*.html files (default: cwd)")
+    parser.add_argument("--out", default="dist/api", help="output directory (default: dist/api)")
+    parser.add_argument("--force", action="store_true", help="re-render every version even if unchanged")
+    args = parser.parse_args(argv)
+
+    out_dir = os.path.abspath(args.out)
+    os.chdir(args.archive)
+    result = export_all(out_dir, force=args.force)
+    print(f"Rendered {len(result['rendered'])} version(s), skipped {len(result['skipped'])} unchanged")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Local cache for each version's Patch Highlights hero image, with pre-resized WebP variants.
+
+The image is fetched once when a version is parsed and stored under IMAGE_DIR/<version>/,
+then served from /highlights/{v}/image so page views no longer depend on Riot's CDN.
+Resizing needs Pillow; without it only the original image is cached and served.
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+
+import requests
+
+try:
+    from PIL import Image
+except ImportError:  # optional: without Pillow only the original image is cached
+    Image = None
+
+IMAGE_CACHE = os.getenv("IMAGE_CACHE", "1") != "0"
+IMAGE_DIR = os.getenv("IMAGE_DIR", "images")
+IMAGE_TIMEOUT = 10
+VARIANT_WIDTHS = (480, 960, 1440)
+WEBP_QUALITY = 80
+
+_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+    "image/avif": ".avif",
+}
+
+
+def _version_dir(patch_version: str) -> str:
+    return os.path.join(IMAGE_DIR, patch_version)
+
+
+def _etag(data: bytes) -> str:
+    return f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+
+
+def _write(path: str, data: bytes):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_manifest(patch_version: str) -> dict | None:
+    path = os.path.join(_version_dir(patch_version), "index.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def resize_variants(data: bytes) -> list[tuple[int, bytes]]:
+    """Re-encode an image as WebP at each of VARIANT_WIDTHS, never upscaling past the original width."""
+    if Image is None:
+        return []
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        variants = []
+        for width in VARIANT_WIDTHS:
+            width = min(width, img.width)
+            if any(w == width for w, _ in variants):
+                continue
+            height = max(1, round(img.height * width / img.width))
+            resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+            buf = io.BytesIO()
+            resized.save(buf, "WEBP", quality=WEBP_QUALITY, method=4)
+            variants.append((width, buf.getvalue()))
+    return variants
+
+
+def ingest(patch_version: str, src: str) -> dict | None:
+    """Download a version's hero image once and write its variants; returns the image manifest or None."""
+    manifest = load_manifest(patch_version)
+    if manifest and manifest.get("source") == src:
+        return manifest
+
+    try:
+        r = requests.get(src, timeout=IMAGE_TIMEOUT)
+        r.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"Could not fetch highlight image for {patch_version}: {e}")
+        return None
+
+    data = r.content
+    media_type = r.headers.get("Content-Type", "").split(";")[0].strip() or "application/octet-stream"
+    out_dir = _version_dir(patch_version)
+    os.makedirs(out_dir, exist_ok=True)
+
+    original = f"original{_EXTENSIONS.get(media_type, '')}"
+    _write(os.path.join(out_dir, original), data)
+    manifest = {
+        "source": src,
+        "original": {"file": original, "media_type": media_type, "etag": _etag(data)},
+        "variants": {},
+    }
+    try:
+        for width, body in resize_variants(data):
+            name = f"{width}.webp"
+            _write(os.path.join(out_dir, name), body)
+            manifest["variants"][str(width)] = {"file": name, "media_type": "image/webp", "etag": _etag(body)}
+    except Exception as e:
+        # Undecodable images are still served as-is
+        print(f"Could not resize highlight image for {patch_version}: {e}")
+
+    _write(os.path.join(out_dir, "index.json"), json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+def revision(manifest: dict) -> str:
+    """Short content hash of the original image, used as the `rev` URL parameter."""
+    return manifest["original"]["etag"].strip('"')[:12]
+
+
+def localize_highlights(patch_version: str, highlights: dict) -> dict:
+    """Point a highlights payload at the locally cached variants, keeping the CDN URL as source_image."""
+    src = highlights.get("image")
+    if not IMAGE_CACHE or not src:
+        return highlights
+    if src.startswith("//"):
+        src = f"https:{src}"
+    manifest = ingest(patch_version, src)
+    if manifest is None:
+        return highlights
+
+    # The content hash in the URL keeps long-lived caching correct if Riot swaps the image
+    base = f"/highlights/{patch_version}/image"
+    rev = revision(manifest)
+    widths = sorted(int(w) for w in manifest["variants"])
+    return {
+        **highlights,
+        "image": f"{base}?rev={rev}",
+        "srcset": ", ".join(f"{base}?w={w}&rev={rev} {w}w" for w in widths),
+        "source_image": src,
+    }
+
+
+def resolve(patch_version: str, width: int | None = None) -> tuple[str, str, str, str] | None:
+    """Pick the cached file for a requested width: the smallest variant at least that wide,
+    else the largest; the largest when no width is given. Returns (path, media type, ETag, rev)."""
+    manifest = load_manifest(patch_version)
+    if manifest is None:
+        return None
+    variants = sorted(manifest["variants"].items(), key=lambda kv: int(kv[0]))
+    if variants:
+        wide_enough = [entry for w, entry in variants if width is not None and int(w) >= width]
+        entry = wide_enough[0] if wide_enough else variants[-1][1]
+    else:
+        entry = manifest["original"]
+    path = os.path.join(_version_dir(patch_version), entry["file"])
+    return path, entry["media_type"], entry["etag"], revision(manifest)
+
+
+def export_highlights(patch_version: str, highlights: dict, out_dir: str) -> dict:
+    """Copy a version's cached image files into a static export tree and point the payload at them.
+
+    Static servers ignore the `w`/`rev` query, so each file gets its own path:
+    /highlights/<v>/image/<file>. Payloads that were never localized are returned unchanged.
+    """
+    manifest = load_manifest(patch_version)
+    if manifest is None or not (highlights.get("image") or "").startswith("/highlights/"):
+        return highlights
+    target = os.path.join(out_dir, "highlights", patch_version, "image")
+    os.makedirs(target, exist_ok=True)
+    entries = [manifest["original"], *manifest["variants"].values()]
+    for entry in entries:
+        shutil.copyfile(os.path.join(_version_dir(patch_version), entry["file"]), os.path.join(target, entry["file"]))
+
+    base = f"/highlights/{patch_version}/image"
+    variants = sorted(manifest["variants"].items(), key=lambda kv: int(kv[0]))
+    largest = variants[-1][1]["file"] if variants else manifest["original"]["file"]
+    return {
+        **highlights,
+        "image": f"{base}/{largest}",
+        "srcset": ", ".join(f"{base}/{entry['file']} {w}w" for w, entry in variants),
+    }
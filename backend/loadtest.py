@@ -0,0 +1,315 @@
+"""Load-test harness with local stand-ins for Riot's patch-notes site and Ollama.
+
+Usage (from the repository root):
+
+    python -m backend.loadtest --rate 50 --duration 30 --riot-latency 150 --ollama-latency 2000
+
+Starts stub servers for the patch-notes index, the patch articles and Ollama's
+/api/generate (each with configurable latency and failure injection), launches the API
+with PATCH_NOTES_URL, PATCH_DETAIL_URL and OLLAMA_URL pointed at them in a scratch
+archive directory, drives a weighted mix of endpoints at a fixed request rate and
+reports per-endpoint latency percentiles, throughput and error rates.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Endpoint templates -> relative weight; {v} is a random stub version, {old}/{new} an ordered pair
+DEFAULT_MIX = {
+    "/bundle/": 20,
+    "/bundle/{v}": 20,
+    "/champions/{v}": 10,
+    "/items/{v}": 10,
+    "/other/{v}": 5,
+    "/changes/{v}": 5,
+    "/tagline/": 5,
+    "/summary/": 10,
+    "/version/": 5,
+    "/versions/": 5,
+    "/diff/{old}/{new}": 5,
+}
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    failure_rate: float = 0.0
+
+
+def synthetic_patch_html(version: str, champions: int = 30, items: int = 12) -> str:
+    """A patch article with the same structure as Riot's, sized like a typical patch."""
+    rnd = random.Random(version)
+    blocks = []
+    for i in range(champions):
+        bullets = "".join(
+            f"<li><strong>Damage:</strong> {rnd.randint(40, 90)}/{rnd.randint(90, 140)} "
+            f"⇒ {rnd.randint(40, 90)}/{rnd.randint(90, 140)}</li>"
+            f"<li><strong>Cooldown:</strong> {rnd.randint(8, 14)} seconds ⇒ {rnd.randint(8, 14)} seconds</li>"
+            for _ in range(2)
+        )
+        blocks.append(
+            f'<div class="content-border"><div><h3 class="change-title"><a href="#c{i}">Champion {i}</a></h3>'
+            f'<p class="summary">Champion {i} gets longer stuns and lower cooldowns.</p>'
+            f'<h4 class="change-detail-title ability-title">Q - Ability {i}</h4><ul>{bullets}</ul></div></div>'
+        )
+    champion_html = "".join(blocks)
+    item_html = "".join(
+        f'<div class="content-border"><div><h4 class="change-detail-title">Item {i}</h4>'
+        f'<ul><li><strong>Cost:</strong> {rnd.randint(2500, 3500)} gold ⇒ {rnd.randint(2500, 3500)} gold</li>'
+        f'<li><strong>Ability Power:</strong> {rnd.randint(60, 120)} ⇒ {rnd.randint(60, 120)}</li></ul></div></div>'
+        for i in range(items)
+    )
+    return (
+        f'<html><head><meta name="description" content="Patch {version} notes"></head><body>'
+        f'<div data-testid="tagline">Patch {version} load-test article</div>'
+        f'<header><h2 id="patch-patch-highlights">Patch Highlights</h2></header>'
+        f'<div class="content-border"><img src="https://example.invalid/{version}.jpg" alt=""><p>Arena returns</p></div>'
+        f'<header><h2 id="patch-champions">Champions</h2></header>{champion_html}'
+        f'<header><h2 id="patch-items">Items</h2></header>{item_html}'
+        f'<header><h2 id="patch-arena">Arena</h2></header>'
+        f'<div class="content-border"><div><h4 class="change-title">Augments</h4><ul><li>Arena augments tuned</li></ul></div></div>'
+        f'</body></html>'
+    )
+
+
+def _index_html(versions: list[str]) -> str:
+    cards = "".join(f'<div data-testid="card-title">Patch {v.replace("-", ".")} Notes</div>' for v in versions)
+    return f"<html><body>{cards}</body></html>"
+
+
+def start_stub(config: StubConfig, versions: list[str]) -> ThreadingHTTPServer:
+    """Serve the patch-notes index, patch articles and Ollama's /api/generate on a free local port."""
+    article_re = re.compile(r"/news/game-updates/patch-(\d+-\d+)-notes/?$")
+
+    class Handler(BaseHTTPRequestHandler):
+        def _delay_or_fail(self) -> bool:
+            delay = config.latency_ms + random.uniform(0, config.jitter_ms)
+            if delay:
+                time.sleep(delay / 1000)
+            if random.random() < config.failure_rate:
+                self._send(503, b"injected failure", "text/plain")
+                return True
+            return False
+
+        def _send(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self._delay_or_fail():
+                return
+            path = self.path.split("?", 1)[0]
+            if path.rstrip("/").endswith("/news/tags/patch-notes"):
+                self._send(200, _index_html(versions).encode("utf-8"), "text/html; charset=utf-8")
+            elif (m := article_re.search(path)) and m.group(1) in versions:
+                self._send(200, synthetic_patch_html(m.group(1)).encode("utf-8"), "text/html; charset=utf-8")
+            else:
+                self._send(404, b"not found", "text/plain")
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self._delay_or_fail():
+                return
+            if self.path.rstrip("/") == "/api/generate":
+                body = json.dumps({"response": "Champion buffs and item cost cuts shake up the meta."})
+                self._send(200, body.encode("utf-8"), "application/json")
+            else:
+                self._send(404, b"not found", "text/plain")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stub_url(server: ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_api(riot_url: str, ollama_url: str, workdir: str, extra_env: dict | None = None):
+    """Launch the API under uvicorn in workdir with upstream URLs pointed at the stubs; returns (process, base URL)."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": REPO_ROOT,
+        "PATCH_NOTES_URL": f"{riot_url}/news/tags/patch-notes/",
+        "PATCH_DETAIL_URL": f"{riot_url}/news/game-updates/patch-{{version}}-notes/",
+        "OLLAMA_URL": ollama_url,
+        "WEBHOOK_POLL_INTERVAL": "0",
+        "REVALIDATE_INTERVAL": "0",
+        "IMAGE_CACHE": "0",
+        **(extra_env or {}),
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            requests.get(f"{base}/", timeout=1)
+            return proc, base
+        except requests.exceptions.RequestException:
+            if proc.poll() is not None:
+                raise RuntimeError("API process exited during startup")
+            time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError("API did not start in time")
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _expand(template: str, versions: list[str]) -> str:
+    old = new = None
+    if "{old}" in template:
+        old, new = sorted(random.sample(versions, 2), key=lambda v: tuple(int(x) for x in v.split("-")))
+    return template.format(v=random.choice(versions), old=old, new=new)
+
+
+def run_load(base_url: str, mix: dict[str, int], versions: list[str], rate: float, duration: float,
+             concurrency: int = 64, timeout: float = 30) -> dict:
+    """Open-loop load: issue requests at a fixed rate regardless of response times, then summarize.
+
+    Latency is measured from each request's scheduled send time, not from when a worker
+    picked it up, so time spent queued behind a saturated pool counts (no coordinated omission).
+    """
+    templates, weights = zip(*mix.items())
+    results: list[tuple[str, float, float, bool]] = []
+    lock = threading.Lock()
+
+    def fire(template: str, scheduled: float):
+        url = base_url + _expand(template, versions)
+        queued_ms = (time.perf_counter() - scheduled) * 1000
+        try:
+            ok = requests.get(url, timeout=timeout).status_code < 400
+        except requests.exceptions.RequestException:
+            ok = False
+        elapsed_ms = (time.perf_counter() - scheduled) * 1000
+        with lock:
+            results.append((template, elapsed_ms, queued_ms, ok))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        n = 0
+        while (now := time.perf_counter() - start) < duration:
+            due = n / rate
+            if due > now:
+                time.sleep(due - now)
+            pool.submit(fire, random.choices(templates, weights)[0], start + due)
+            n += 1
+    wall = time.perf_counter() - start
+
+    # A request is late when it waited longer than one send interval for a free worker
+    late_ms = 1000 / rate
+    queue_delays = sorted(q for _, _, q, _ in results)
+    report = {
+        "requests": len(results), "seconds": round(wall, 2), "throughput_rps": round(len(results) / wall, 2),
+        "target_requests": int(math.ceil(rate * duration)),
+        "dropped": max(0, int(math.ceil(rate * duration)) - n),
+        "late": sum(1 for q in queue_delays if q > late_ms),
+        "queue_p99_ms": round(percentile(queue_delays, 99), 1),
+        "endpoints": {},
+    }
+    for template in templates:
+        latencies = sorted(ms for t, ms, _, _ in results if t == template)
+        if not latencies:
+            continue
+        errors = sum(1 for t, _, _, ok in results if t == template and not ok)
+        report["endpoints"][template] = {
+            "count": len(latencies),
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p90_ms": round(percentile(latencies, 90), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+            "max_ms": round(latencies[-1], 1),
+            "error_rate": round(errors / len(latencies), 4),
+        }
+    return report
+
+
+def print_report(report: dict):
+    print(f"{report['requests']} requests in {report['seconds']}s ({report['throughput_rps']} req/s)")
+    print(f"target {report['target_requests']}, not sent {report['dropped']}, queued late {report['late']} "
+          f"(queue p99 {report['queue_p99_ms']} ms)")
+    print(f"{'endpoint':<22}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>9}")
+    for template, s in sorted(report["endpoints"].items()):
+        print(f"{template:<22}{s['count']:>7}{s['p50_ms']:>10}{s['p90_ms']:>10}{s['p99_ms']:>10}"
+              f"{s['max_ms']:>10}{s['error_rate']:>9.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the API against local Riot and Ollama stubs.")
+    parser.add_argument("--rate", type=float, default=20, help="requests per second (default: 20)")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of traffic (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=64, help="max in-flight requests (default: 64)")
+    parser.add_argument("--versions", type=int, default=6, help="number of stub patch versions (default: 6)")
+    parser.add_argument("--riot-latency", type=float, default=100, help="stub Riot latency in ms (default: 100)")
+    parser.add_argument("--riot-jitter", type=float, default=50, help="extra random Riot latency in ms")
+    parser.add_argument("--riot-failure-rate", type=float, default=0.0, help="fraction of Riot requests failing with 503")
+    parser.add_argument("--ollama-latency", type=float, default=1500, help="stub Ollama latency in ms (default: 1500)")
+    parser.add_argument("--ollama-failure-rate", type=float, default=0.0, help="fraction of Ollama calls failing")
+    parser.add_argument("--target", help="base URL of an already running API (skips starting one)")
+    parser.add_argument("--json", dest="json_out", help="also write the report as JSON to this path")
+    args = parser.parse_args(argv)
+    if args.versions < 2:
+        parser.error("--versions must be at least 2 (the diff endpoint needs a pair)")
+
+    versions = [f"25-{n}" for n in range(args.versions, 0, -1)]
+    riot = start_stub(StubConfig(args.riot_latency, args.riot_jitter, args.riot_failure_rate), versions)
+    ollama = start_stub(StubConfig(args.ollama_latency, 0, args.ollama_failure_rate), versions)
+    proc = None
+    with tempfile.TemporaryDirectory(prefix="loadtest-archive-") as workdir:
+        try:
+            base = args.target
+            if not base:
+                proc, base = start_api(stub_url(riot), stub_url(ollama), workdir)
+                print(f"API at {base}, Riot stub at {stub_url(riot)}, Ollama stub at {stub_url(ollama)}")
+            report = run_load(base, DEFAULT_MIX, versions, args.rate, args.duration, args.concurrency)
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=10)
+            riot.shutdown()
+            ollama.shutdown()
+
+    print_report(report)
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
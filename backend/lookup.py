@@ -0,0 +1,78 @@
+"""Per-version name index for single champion / item lookups.
+
+Names are normalized (accents, case and punctuation stripped, so "Kai'Sa", "kaisa" and
+"KAI SA" are the same key). Exact matches are a dict hit, prefix matches a bisect over
+the sorted keys, and anything else falls back to a fuzzy close-match search.
+"""
+import difflib
+import re
+import unicodedata
+from bisect import bisect_left
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+FUZZY_CUTOFF = 0.75
+MAX_ALTERNATIVES = 5
+
+# (version, section) -> (entries dict the index was built from, normalized -> name, sorted keys)
+_INDEX_CACHE: dict[tuple[str, str], tuple[dict, dict[str, str], list[str]]] = {}
+
+
+def normalize_name(name: str) -> str:
+    """Fold a display name to its lookup key: "Kai'Sa" -> "kaisa", "Rabadon's Deathcap" -> "rabadonsdeathcap"."""
+    decomposed = unicodedata.normalize('NFKD', name)
+    ascii_only = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM_RE.sub('', ascii_only.lower())
+
+
+def _index(patch_version: str, section: str, entries: dict) -> tuple[dict[str, str], list[str]]:
+    cached = _INDEX_CACHE.get((patch_version, section))
+    # Re-ingestion swaps in a new entries dict, which invalidates the index by identity
+    if cached and cached[0] is entries:
+        return cached[1], cached[2]
+
+    exact: dict[str, str] = {}
+    for name in entries:
+        exact.setdefault(normalize_name(name), name)
+    keys = sorted(exact)
+    _INDEX_CACHE[(patch_version, section)] = (entries, exact, keys)
+    return exact, keys
+
+
+def find_entry(patch_version: str, section: str, entries: dict, query: str) -> dict | None:
+    """Resolve `query` against one bundle section; None when nothing matches."""
+    exact, keys = _index(patch_version, section, entries)
+    key = normalize_name(query)
+    if not key:
+        return None
+
+    match, candidates = None, []
+    if key in exact:
+        match, candidates = "exact", [exact[key]]
+    else:
+        i = bisect_left(keys, key)
+        while i < len(keys) and keys[i].startswith(key) and len(candidates) <= MAX_ALTERNATIVES:
+            candidates.append(exact[keys[i]])
+            i += 1
+        if candidates:
+            match = "prefix"
+        else:
+            candidates = [exact[k] for k in difflib.get_close_matches(key, keys, n=MAX_ALTERNATIVES + 1, cutoff=FUZZY_CUTOFF)]
+            match = "fuzzy" if candidates else None
+    if not match:
+        return None
+
+    name = candidates[0]
+    return {
+        "version": patch_version,
+        "query": query,
+        "match": match,
+        "name": name,
+        section: {name: entries[name]},
+        "alternatives": candidates[1:],
+    }
+
+
+def forget_version(patch_version: str):
+    """Drop a version's name indexes."""
+    for key in [k for k in _INDEX_CACHE if k[0] == patch_version]:
+        _INDEX_CACHE.pop(key, None)
@@ -1,8 +1,41 @@
-from . import utils
-from fastapi import FastAPI
+import asyncio
+
+from . import analytics, diff, encoding, images, lookup, parsing, revalidate, utils, webhooks
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
 
 app = FastAPI()
 
+_EMPTY_HIGHLIGHTS = {"image": None, "alt": "", "caption": ""}
+
+
+async def _lookup(request: Request, patch_version: str, section: str, name: str):
+    """Single champion / item entry by normalized, prefix or fuzzy name match."""
+    bundle = await parsing.get_bundle(patch_version)
+    found = lookup.find_entry(patch_version, section, bundle.get(section, {}), name)
+    if found is None:
+        raise HTTPException(status_code=404, detail=f"no {section} entry matching {name!r} in {patch_version}")
+    # Not byte-cached: every spelling of a name would add an entry, and the index lookup is already cheap
+    return encoding.respond(request, found)
+
+
+def _changes_response(request: Request, patch_version: str, direction: str | None, section: str | None):
+    """Filtered change records; only filters naming a known direction/section get a cache entry."""
+    if direction is not None and direction not in utils.CHANGE_DIRECTIONS:
+        raise HTTPException(status_code=400, detail=f"direction must be one of {', '.join(utils.CHANGE_DIRECTIONS)}")
+    changes = utils.get_changes(patch_version, direction=direction, section=section)
+    known_section = section is None or any(r.section == section for r in utils.get_change_records(patch_version))
+    cache_key = (patch_version, "changes", direction, section) if known_section else None
+    return encoding.respond(request, changes, cache_key)
+
+
+async def _latest_version():
+    """Resolve the latest patch version without blocking the event loop on the upstream fetch."""
+    return await run_in_threadpool(utils.find_patch_version)
+
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Patch Notes API!"}
@@ -12,55 +45,102 @@ def read_root():
 #########################
 
 @app.get("/champions/{patch_version}")
-def get_champions_by_version(patch_version: str):
+async def get_champions_by_version(patch_version: str, request: Request):
     """
     Endpoint to get champions for a specific patch version.
     """
-    return utils.parse_champions(patch_version)
+    bundle = await parsing.get_bundle(patch_version)
+    return encoding.respond(request, {"champions": bundle.get("champions", {})}, (patch_version, "champions"))
+
+@app.get("/champions/{patch_version}/{name}")
+async def get_champion_by_name(patch_version: str, name: str, request: Request):
+    """
+    Endpoint to get one champion for a specific patch version. The name is matched ignoring
+    case, accents and punctuation ("kaisa" finds "Kai'Sa"), then by prefix, then fuzzily.
+    """
+    return await _lookup(request, patch_version, "champions", name)
 
 @app.get("/champions/")
-def get_latest_champions():
+async def get_latest_champions(request: Request):
     """
     Endpoint to get champions for the latest patch version.
     """
-    patch_version = utils.find_patch_version()
-    champions_data = utils.parse_champions(patch_version)
-    return champions_data
+    patch_version = await _latest_version()
+    bundle = await parsing.get_bundle(patch_version)
+    return encoding.respond(request, {"champions": bundle.get("champions", {})}, (patch_version, "champions"))
 
 #########################
 # Items Endpoints
 #########################
 
 @app.get("/items/{patch_version}")
-def get_items_by_version(patch_version: str):
+async def get_items_by_version(patch_version: str, request: Request):
     """
     Endpoint to get items for a specific patch version.
     """
-    return utils.parse_items(patch_version)
+    bundle = await parsing.get_bundle(patch_version)
+    return encoding.respond(request, {"items": bundle.get("items", {})}, (patch_version, "items"))
+
+@app.get("/items/{patch_version}/{name}")
+async def get_item_by_name(patch_version: str, name: str, request: Request):
+    """
+    Endpoint to get one item for a specific patch version, matched like champion names.
+    """
+    return await _lookup(request, patch_version, "items", name)
 
 @app.get("/items/")
-def get_latest_items():
+async def get_latest_items(request: Request):
     """
     Endpoint to get items for the latest patch version.
     """
-    patch_version = utils.find_patch_version()
-    items_data = utils.parse_items(patch_version)
-    return items_data
+    patch_version = await _latest_version()
+    bundle = await parsing.get_bundle(patch_version)
+    return encoding.respond(request, {"items": bundle.get("items", {})}, (patch_version, "items"))
 
 
 @app.get("/other/")
-def get_latest_other():
+async def get_latest_other(request: Request):
     """
     Endpoint to get other data for the latest patch version.
     """
-    return utils.parse_other(utils.find_patch_version())
+    patch_version = await _latest_version()
+    bundle = await parsing.get_bundle(patch_version)
+    return encoding.respond(request, bundle.get("other", {}), (patch_version, "other"))
 
 @app.get("/other/{patch_version}")
-def get_other_by_version(patch_version: str):
+async def get_other_by_version(patch_version: str, request: Request):
     """
     Endpoint to get other data for a specific patch version.
     """
-    return utils.parse_other(patch_version)
+    bundle = await parsing.get_bundle(patch_version)
+    return encoding.respond(request, bundle.get("other", {}), (patch_version, "other"))
+
+
+#########################
+# Structured Changes Endpoints
+#########################
+
+
+@app.get("/changes/{patch_version}")
+async def get_changes_by_version(
+    patch_version: str, request: Request, direction: str | None = None, section: str | None = None
+):
+    """
+    Endpoint to get numeric "before -> after" change records for a specific patch version.
+    Optional filters: direction (buff, nerf, adjustment) and section (e.g. champions, items).
+    """
+    await parsing.get_bundle(patch_version)
+    return _changes_response(request, patch_version, direction, section)
+
+
+@app.get("/changes/")
+async def get_latest_changes(request: Request, direction: str | None = None, section: str | None = None):
+    """
+    Endpoint to get numeric change records for the latest patch version.
+    """
+    patch_version = await _latest_version()
+    await parsing.get_bundle(patch_version)
+    return _changes_response(request, patch_version, direction, section)
 
 
 #########################
@@ -69,15 +149,61 @@ def get_other_by_version(patch_version: str):
 
 
 @app.get("/arena/{patch_version}")
-def get_arena_by_version(patch_version: str):
+async def get_arena_by_version(patch_version: str, request: Request):
+    """
+    Endpoint to get Arena changes (+ mentions across the whole document) for a specific patch version.
+    """
+    bundle = await parsing.get_bundle(patch_version)
+    return encoding.respond(request, bundle.get("arena", {"arena": {}, "mentions": []}), (patch_version, "arena"))
+
+
+#########################
+# Heat-map Endpoint
+#########################
+
+
+@app.get("/heatmap/")
+async def get_heatmap(
+    request: Request,
+    from_version: str | None = Query(None, alias="from"),
+    to_version: str | None = Query(None, alias="to"),
+    section: str | None = None,
+    window: int = 3,
+):
     """
-    Endpoint to get Arena changes for a specific patch version.
+    Endpoint to get the entity x version change heat-map across archived patch versions.
+    Optional filters: from/to version range (inclusive), section (e.g. champions) and rolling window size.
     """
-    arena = utils.parse_arena(patch_version) or {"arena": {}}
-    mentions = utils.collect_arena_everywhere(patch_version) or {"arena_mentions": []}
-    # merge
-    arena.update({"mentions": mentions.get('arena_mentions', [])})
-    return arena
+    # Parse any cold versions in parallel first; the matrix assembly itself is cheap NumPy work
+    await parsing.prefetch(await run_in_threadpool(utils.list_archived_versions))
+    heatmap = await run_in_threadpool(analytics.build_heatmap, from_version, to_version, section, window)
+    return encoding.respond(request, heatmap)
+
+
+#########################
+# Diff Endpoint
+#########################
+
+
+@app.get("/diff/{from_version}/{to_version}")
+async def get_diff(from_version: str, to_version: str, request: Request):
+    """
+    Endpoint to get the net changes for players skipping from one patch to a later one:
+    every champion, item and other-section entry touched in the versions after from_version
+    up to to_version, with its latest state and the per-version sequence of changes.
+    Only archived versions are used; versions missing from the archive are listed under "missing".
+    """
+    if utils.version_key(from_version) >= utils.version_key(to_version):
+        raise HTTPException(status_code=400, detail="from_version must be older than to_version")
+    try:
+        span = await run_in_threadpool(diff.versions_between, from_version, to_version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = diff.cached_diff(from_version, to_version, span[0])
+    if result is None:
+        await parsing.prefetch(span[0])
+        result = await run_in_threadpool(diff.build_diff, from_version, to_version, span)
+    return encoding.respond(request, result)
 
 
 #########################
@@ -86,20 +212,22 @@ def get_arena_by_version(patch_version: str):
 
 
 @app.get("/tagline/{patch_version}")
-def get_tagline_by_version(patch_version: str):
+async def get_tagline_by_version(patch_version: str, request: Request):
     """
     Endpoint to get the short developer tagline for a specific patch version.
     """
-    return utils.parse_tagline(patch_version)
+    bundle = await parsing.get_bundle(patch_version)
+    return encoding.respond(request, {"tagline": bundle.get("tagline")}, (patch_version, "tagline"))
 
 
 @app.get("/tagline/")
-def get_latest_tagline():
+async def get_latest_tagline(request: Request):
     """
     Endpoint to get the short developer tagline for the latest patch version.
     """
-    pv = utils.find_patch_version()
-    return utils.parse_tagline(pv)
+    patch_version = await _latest_version()
+    bundle = await parsing.get_bundle(patch_version)
+    return encoding.respond(request, {"tagline": bundle.get("tagline")}, (patch_version, "tagline"))
 
 
 #########################
@@ -108,20 +236,22 @@ def get_latest_tagline():
 
 
 @app.get("/version/")
-def get_latest_version():
+async def get_latest_version(request: Request):
     """
     Endpoint to get the latest patch version as a string (e.g., "25-16").
     """
-    v = utils.find_patch_version()
-    return {"version": v}
+    v = await _latest_version()
+    # No cache key: the latest alias changes when a new patch ships
+    return encoding.respond(request, {"version": v})
 
 
 @app.get("/versions/")
-def get_recent_versions():
+async def get_recent_versions(request: Request):
     """
     Endpoint to get the last few patch versions as a list.
     """
-    return utils.list_patch_versions(limit=3)
+    versions = await run_in_threadpool(utils.list_patch_versions, 3)
+    return encoding.respond(request, versions)
 
 
 #########################
@@ -130,25 +260,29 @@ def get_recent_versions():
 
 
 @app.get("/summary/")
-def get_latest_summary():
-    pv = utils.find_patch_version()
-    return utils.generate_one_liner_summary(pv)
+async def get_latest_summary(request: Request):
+    """
+    Endpoint to get the one-liner for the latest patch version. Answers immediately with an
+    extractive summary ("extractive": true) until the background LLM one-liner is ready.
+    """
+    pv = await _latest_version()
+    await parsing.get_bundle(pv)
+    return encoding.respond(request, utils.get_summary(pv))
 
 
 @app.get("/summary/{patch_version}")
-def get_summary_by_version(patch_version: str):
-    return utils.generate_one_liner_summary(patch_version)
+async def get_summary_by_version(patch_version: str, request: Request):
+    await parsing.get_bundle(patch_version)
+    return encoding.respond(request, utils.get_summary(patch_version))
 
 @app.get("/arena/")
-def get_latest_arena():
+async def get_latest_arena(request: Request):
     """
     Endpoint to get Arena changes for the latest patch version.
     """
-    patch_version = utils.find_patch_version()
-    arena = utils.parse_arena(patch_version) or {"arena": {}}
-    mentions = utils.collect_arena_everywhere(patch_version) or {"arena_mentions": []}
-    arena.update({"mentions": mentions.get('arena_mentions', [])})
-    return arena
+    patch_version = await _latest_version()
+    bundle = await parsing.get_bundle(patch_version)
+    return encoding.respond(request, bundle.get("arena", {"arena": {}, "mentions": []}), (patch_version, "arena"))
 
 
 #########################
@@ -157,14 +291,86 @@ def get_latest_arena():
 
 
 @app.get("/highlights/")
-def get_latest_highlights():
-    pv = utils.find_patch_version()
-    return utils.parse_highlights(pv)
+async def get_latest_highlights(request: Request):
+    patch_version = await _latest_version()
+    bundle = await parsing.get_bundle(patch_version)
+    return encoding.respond(
+        request, {"highlights": bundle.get("highlights", _EMPTY_HIGHLIGHTS)}, (patch_version, "highlights")
+    )
 
 
 @app.get("/highlights/{patch_version}")
-def get_highlights_by_version(patch_version: str):
-    return utils.parse_highlights(patch_version)
+async def get_highlights_by_version(patch_version: str, request: Request):
+    bundle = await parsing.get_bundle(patch_version)
+    return encoding.respond(
+        request, {"highlights": bundle.get("highlights", _EMPTY_HIGHLIGHTS)}, (patch_version, "highlights")
+    )
+
+
+@app.get("/highlights/{patch_version}/image")
+async def get_highlight_image(patch_version: str, request: Request, w: int | None = None, rev: str | None = None):
+    """
+    Endpoint to serve the locally cached hero image for a specific patch version. `w` picks
+    the smallest pre-resized WebP variant at least that wide; without it the largest is served.
+    Only URLs whose `rev` matches the current image are cached as immutable.
+    """
+    await parsing.get_bundle(patch_version)  # ingestion fetches the image on first parse
+    found = await run_in_threadpool(images.resolve, patch_version, w)
+    if found is None:
+        raise HTTPException(status_code=404, detail=f"no cached highlight image for {patch_version}")
+    path, media_type, etag, current_rev = found
+    if rev == current_rev:
+        cache_control = "public, max-age=31536000, immutable"
+    else:
+        # Un-revved (or stale-rev) URLs can change when the image is re-ingested
+        cache_control = "public, max-age=300"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+#########################
+# Webhook Subscription Endpoints
+#########################
+
+
+class SubscriptionIn(BaseModel):
+    url: str
+    secret: str | None = None
+
+
+@app.post("/subscriptions/")
+def create_subscription(sub: SubscriptionIn):
+    """
+    Register a webhook URL that receives a compact digest whenever a new patch is ingested.
+    If a secret is given, deliveries carry an X-Signature-SHA256 HMAC of the body.
+    The response carries a one-time token; send it as X-Subscription-Token to unsubscribe.
+    """
+    try:
+        return webhooks.add_subscription(sub.url, sub.secret)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/subscriptions/")
+def get_subscriptions(x_admin_token: str | None = Header(None)):
+    """
+    Admin-only listing (X-Admin-Token must match WEBHOOK_ADMIN_TOKEN); URLs are masked.
+    """
+    if not webhooks.check_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="admin token required")
+    return webhooks.list_subscriptions()
+
+
+@app.delete("/subscriptions/{sub_id}")
+def delete_subscription(
+    sub_id: str, x_subscription_token: str | None = Header(None), x_admin_token: str | None = Header(None)
+):
+    if not webhooks.remove_subscription(sub_id, x_subscription_token or x_admin_token):
+        raise HTTPException(status_code=404, detail="subscription not found")
+    return {"deleted": sub_id}
 
 
 #########################
@@ -173,26 +379,59 @@ def get_highlights_by_version(patch_version: str):
 
 
 @app.get("/bundle/")
-def get_latest_bundle():
+async def get_latest_bundle(request: Request):
     """Aggregate champions, items, other, arena (+mentions), tagline, highlights for the latest version."""
-    pv = utils.find_patch_version()
-    return utils.get_bundle(pv) if pv else {}
+    pv = await _latest_version()
+    bundle = await parsing.get_bundle(pv) if pv else {}
+    return encoding.respond(request, bundle, (pv, "bundle"))
 
 
 @app.get("/bundle/{patch_version}")
-def get_bundle_by_version(patch_version: str):
+async def get_bundle_by_version(patch_version: str, request: Request):
     """Aggregate all data for a specific patch version."""
-    return utils.get_bundle(patch_version)
+    return encoding.respond(request, await parsing.get_bundle(patch_version), (patch_version, "bundle"))
+
+
+# Strong references to fire-and-forget startup tasks so they are not garbage-collected mid-run
+_BACKGROUND_TASKS: set[asyncio.Task] = set()
+
+
+async def _warm_heatmap():
+    """Parse every archived version and build the default heat-map without delaying startup."""
+    try:
+        await parsing.prefetch(await run_in_threadpool(utils.list_archived_versions))
+        await run_in_threadpool(analytics.build_heatmap)
+    except Exception as e:
+        print(f"Heat-map prewarm failed: {e}")
 
 
 @app.on_event("startup")
-def prewarm_bundle_cache():
-    """Pre-warm the in-memory bundle cache for the latest patch version on startup."""
+async def prewarm_bundle_cache():
+    """Pre-warm the bundle cache for the latest patch version; the heat-map warms in the background."""
     try:
-        pv = utils.find_patch_version()
+        pv = await _latest_version()
         if pv:
-            utils.get_bundle(pv)
+            await parsing.get_bundle(pv)
     except Exception:
         # Non-fatal if prewarm fails
         pass
+    task = asyncio.create_task(_warm_heatmap())
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+@app.on_event("startup")
+def start_webhook_watcher():
+    """Poll for new patches in the background and push digests to webhook subscribers."""
+    webhooks.start_watcher()
+
+
+@app.on_event("startup")
+def start_revalidator():
+    """Periodically re-check recent articles for post-release edits and re-ingest changed sections."""
+    revalidate.start_revalidator()
+
 
+@app.on_event("shutdown")
+def stop_parse_pool():
+    parsing.shutdown()
@@ -0,0 +1,105 @@
+"""Run the CPU-bound BeautifulSoup parse stage in a dedicated process pool.
+
+Cold bundles are parsed off the API process so the GIL stays free for cache hits.
+PARSE_WORKERS sets the pool size; 0 falls back to the default thread pool.
+Workers start from a forkserver rather than fork(): the pool is created lazily, after
+the webhook, revalidation and summary threads are running, and forking a threaded
+process can deadlock on locks held at fork time.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from . import utils
+
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_POOL: ProcessPoolExecutor | None = None
+# The pool is also used from the revalidator thread, not just the event loop
+_POOL_LOCK = threading.Lock()
+# One in-flight parse task per version so concurrent cold requests share the work
+_INFLIGHT: dict[str, asyncio.Task] = {}
+
+
+def get_pool() -> ProcessPoolExecutor | None:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None and PARSE_WORKERS > 0:
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload(["backend.utils"])
+            _POOL = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=ctx)
+        return _POOL
+
+
+def shutdown():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
+
+
+def _parse_in_worker(patch_version: str, cwd: str):
+    """Worker entry point; the archive lives in the API's cwd, which may differ from the worker's."""
+    if os.getcwd() != cwd:
+        os.chdir(cwd)
+    return utils.build_bundle(patch_version)
+
+
+def _call_in_worker(cwd: str, fn, *args):
+    if os.getcwd() != cwd:
+        os.chdir(cwd)
+    return fn(*args)
+
+
+def run(fn, *args):
+    """Run a module-level parse function in the pool from a worker thread and wait for it;
+    inline when the pool is disabled. Retries once on a broken pool, like cold parses."""
+    pool = get_pool()
+    if pool is None:
+        return fn(*args)
+    try:
+        return pool.submit(_call_in_worker, os.getcwd(), fn, *args).result()
+    except BrokenProcessPool:
+        print(f"Parse pool broke while running {fn.__name__}; restarting it")
+        if _POOL is pool:
+            shutdown()
+        return get_pool().submit(_call_in_worker, os.getcwd(), fn, *args).result()
+
+
+async def _parse_and_store(patch_version: str) -> dict:
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    try:
+        bundle, rows = await loop.run_in_executor(pool, _parse_in_worker, patch_version, os.getcwd())
+    except BrokenProcessPool:
+        # A worker died (OOM kill, crash) and a broken executor refuses all further work:
+        # replace it, unless a concurrent parse already did, and retry once
+        print(f"Parse pool broke while parsing {patch_version}; restarting it")
+        if _POOL is pool:
+            shutdown()
+        bundle, rows = await loop.run_in_executor(get_pool(), _parse_in_worker, patch_version, os.getcwd())
+    return utils.store_bundle(patch_version, bundle, rows)
+
+
+async def get_bundle(patch_version: str) -> dict:
+    """Async counterpart of utils.get_bundle that parses cold versions in the process pool."""
+    if not patch_version:
+        return {}
+    if patch_version in utils._BUNDLE_CACHE:
+        return utils._BUNDLE_CACHE[patch_version]
+
+    task = _INFLIGHT.get(patch_version)
+    if task is None:
+        task = asyncio.ensure_future(_parse_and_store(patch_version))
+        _INFLIGHT[patch_version] = task
+        task.add_done_callback(lambda _: _INFLIGHT.pop(patch_version, None))
+    return await asyncio.shield(task)
+
+
+async def prefetch(versions: list[str]):
+    """Parse several cold versions in parallel across the pool."""
+    await asyncio.gather(*(get_bundle(v) for v in versions if v not in utils._BUNDLE_CACHE))
@@ -0,0 +1,243 @@
+"""Periodic revalidation of recently published articles that Riot edits after release.
+
+Each archived article has a `patch-<version>.meta.json` sidecar holding its ETag /
+Last-Modified, content hash and per-section subtree hashes. Revalidation uses a
+conditional request; when the content did change, only the bundle fields that depend
+on changed sections are re-extracted (in the parse pool) and only the dependent caches
+are dropped.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import astuple
+
+import requests
+from bs4 import BeautifulSoup
+
+from . import analytics, diff, encoding, images, lookup, parsing, utils, webhooks
+
+REVALIDATE_INTERVAL = int(os.getenv("REVALIDATE_INTERVAL", "3600"))
+REVALIDATE_RECENT = int(os.getenv("REVALIDATE_RECENT", "3"))
+
+# Pseudo-section for the tagline block and meta descriptions outside any h2
+HEAD = "_head"
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _meta_path(patch_version: str) -> str:
+    return f'patch-{patch_version}.meta.json'
+
+
+def _load_meta(patch_version: str) -> dict:
+    if not os.path.exists(_meta_path(patch_version)):
+        return {}
+    with open(_meta_path(patch_version), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_meta(patch_version: str, meta: dict):
+    with open(_meta_path(patch_version), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+
+def section_hashes(html: str) -> dict[str, str]:
+    """Hash every h2 section's subtree (heading plus following siblings) and the head/tagline block."""
+    soup = BeautifulSoup(html, 'html.parser')
+    head = [
+        soup.find('div', attrs={'data-testid': 'tagline'}),
+        soup.find('meta', attrs={'name': 'description'}),
+        soup.find('meta', attrs={'property': 'og:description'}),
+    ]
+    hashes = {HEAD: _sha256(''.join(str(el) for el in head if el))}
+
+    for h2 in soup.find_all('h2'):
+        parts = [str(h2)]
+        current = h2.parent.find_next_sibling()
+        while current:
+            if current.name == 'h2' or (current.name == 'header' and current.find('h2')):
+                break
+            parts.append(str(current))
+            current = current.find_next_sibling()
+        hashes[utils.get_section_key(h2)] = _sha256(''.join(parts))
+    return hashes
+
+
+def forget_dependents(patch_version: str, summary: bool = True):
+    """Drop caches derived from a version's bundle: encoded responses, diffs, heat-map columns, name indexes, digests."""
+    encoding.forget_version(patch_version)
+    diff.forget_version(patch_version)
+    analytics.forget_version(patch_version)
+    lookup.forget_version(patch_version)
+    webhooks.forget_version(patch_version)
+    if summary:
+        utils.forget_summary(patch_version)
+
+
+def _summary_inputs(bundle: dict) -> tuple:
+    """What the one-liner summary is built from: champion and item entries, other-section names
+    and whether an Arena section exists."""
+    return (
+        bundle.get("champions"),
+        bundle.get("items"),
+        set(bundle.get("other", {})),
+        bool(bundle.get("arena", {}).get("arena")),
+    )
+
+
+def extract_sections(patch_version: str, changed: set[str]) -> dict:
+    """Re-run only the parsers that depend on changed sections, without touching the caches.
+
+    Returns the fresh parts keyed by bundle field, plus "rows" (ChangeRecord field tuples)
+    for the changed sections. Runs in the parse pool, so the result stays cheap to pickle.
+    """
+    fresh = {}
+    if "champions" in changed:
+        fresh["champions"] = utils.parse_champions(patch_version).get("champions", {})
+    if "items" in changed:
+        fresh["items"] = utils.parse_items(patch_version).get("items", {})
+    other_keys = changed - {"champions", "items", HEAD}
+    if other_keys:
+        fresh["other"] = utils.parse_other(patch_version, only=other_keys)
+
+    if changed - {HEAD}:
+        if any('arena' in key for key in changed):
+            fresh["arena"] = utils.parse_arena(patch_version).get("arena", {})
+        # Mentions are collected document-wide, so any body change can affect them
+        fresh["mentions"] = utils.collect_arena_everywhere(patch_version).get("arena_mentions", [])
+        fresh["rows"] = [astuple(r) for r in utils.parse_change_records(patch_version) if r.section in changed]
+
+    if HEAD in changed:
+        fresh["tagline"] = utils.parse_tagline(patch_version).get("tagline")
+    if any('highlights' in key for key in changed):
+        highlights = utils.parse_highlights(patch_version).get("highlights")
+        if highlights is not None:
+            fresh["highlights"] = images.localize_highlights(patch_version, highlights)
+    return fresh
+
+
+def apply_section_changes(patch_version: str, changed: set[str]) -> set[str]:
+    """Re-extract only the bundle fields that depend on changed sections; returns the refreshed fields."""
+    if patch_version not in utils._BUNDLE_CACHE:
+        # Nothing parsed yet: the next request parses the new file from scratch
+        utils.forget_version(patch_version)
+        forget_dependents(patch_version)
+        return set()
+
+    fresh = parsing.run(extract_sections, patch_version, changed)
+    old = utils._BUNDLE_CACHE.get(patch_version)
+    if old is None:
+        # Evicted while the pool was parsing
+        forget_dependents(patch_version)
+        return set()
+
+    bundle = dict(old)
+    fields = set()
+    for field in ("champions", "items", "tagline", "highlights"):
+        if field in fresh:
+            bundle[field] = fresh[field]
+            fields.add(field)
+
+    other_keys = changed - {"champions", "items", HEAD}
+    if other_keys:
+        other = dict(bundle.get("other", {}))
+        for key in other_keys:
+            if key in fresh["other"]:
+                other[key] = fresh["other"][key]
+            else:
+                other.pop(key, None)
+        bundle["other"] = other
+        fields.add("other")
+
+    if "rows" in fresh:
+        arena = dict(bundle.get("arena", {"arena": {}, "mentions": []}))
+        if "arena" in fresh:
+            arena["arena"] = fresh["arena"]
+        arena["mentions"] = fresh["mentions"]
+        bundle["arena"] = arena
+        fields.add("arena")
+
+        records = [r for r in utils._CHANGES_CACHE.get(patch_version, ()) if r.section not in changed]
+        records += [utils.ChangeRecord(*row) for row in fresh["rows"]]
+        utils._CHANGES_CACHE[patch_version] = tuple(records)
+        fields.add("changes")
+
+    # Swap in a new dict so concurrent readers never see a half-updated bundle
+    utils._BUNDLE_CACHE[patch_version] = bundle
+    forget_dependents(patch_version, summary=_summary_inputs(bundle) != _summary_inputs(old))
+    return fields
+
+
+def revalidate(patch_version: str) -> dict:
+    """Conditionally re-fetch one article and apply any section-level changes."""
+    meta = _load_meta(patch_version)
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    r = requests.get(utils.PATCH_DETAIL_URL.format(version=patch_version), headers=headers, timeout=20)
+    if r.status_code == 304:
+        return {"version": patch_version, "status": "not-modified"}
+    r.raise_for_status()
+
+    filename = f'patch-{patch_version}.html'
+    old_html = None
+    if os.path.exists(filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            old_html = f.read()
+
+    html = r.text
+    meta.update(etag=r.headers.get("ETag"), last_modified=r.headers.get("Last-Modified"))
+    if old_html is not None and _sha256(html) == _sha256(old_html):
+        meta.setdefault("sha256", _sha256(html))
+        meta.setdefault("sections", section_hashes(html))
+        _save_meta(patch_version, meta)
+        return {"version": patch_version, "status": "unchanged"}
+
+    old_sections = meta.get("sections") or (section_hashes(old_html) if old_html is not None else {})
+    new_sections = section_hashes(html)
+    changed = {k for k in old_sections.keys() | new_sections.keys() if old_sections.get(k) != new_sections.get(k)}
+
+    tmp = f'{filename}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(html)
+    os.replace(tmp, filename)
+    meta.update(sha256=_sha256(html), sections=new_sections)
+    _save_meta(patch_version, meta)
+
+    fields = apply_section_changes(patch_version, changed)
+    print(f"Re-ingested {patch_version}: sections {sorted(changed)} -> fields {sorted(fields)}")
+    return {"version": patch_version, "status": "updated", "sections": sorted(changed), "fields": sorted(fields)}
+
+
+def revalidate_recent(limit: int = REVALIDATE_RECENT) -> list[dict]:
+    """Revalidate the newest archived versions, where post-release edits happen."""
+    results = []
+    for v in list(reversed(utils.list_archived_versions()))[:limit]:
+        try:
+            results.append(revalidate(v))
+        except Exception as e:
+            print(f"Revalidation of {v} failed: {e}")
+            results.append({"version": v, "status": "error", "error": str(e)})
+    return results
+
+
+def _loop(interval: int):
+    while True:
+        time.sleep(interval)
+        revalidate_recent()
+
+
+def start_revalidator(interval: int = REVALIDATE_INTERVAL):
+    """Revalidate recent articles every `interval` seconds in a daemon thread."""
+    if interval <= 0:
+        return None
+    t = threading.Thread(target=_loop, args=(interval,), name="revalidator", daemon=True)
+    t.start()
+    return t
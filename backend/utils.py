@@ -2,12 +2,19 @@ import requests
 import json
 import re
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, astuple
 import os
+import threading
+import time
+
+from . import images
 
 # Constants
-BASE_URL = "https://www.leagueoflegends.com/en-us"
-PATCH_NOTES_URL = f"{BASE_URL}/news/tags/patch-notes/"
-PATCH_DETAIL_URL = f"{BASE_URL}/news/game-updates/patch-{{version}}-notes/"
+# Upstream URLs can be overridden (e.g. to point the load-test harness at local stubs)
+BASE_URL = os.getenv("RIOT_BASE_URL", "https://www.leagueoflegends.com/en-us")
+PATCH_NOTES_URL = os.getenv("PATCH_NOTES_URL", f"{BASE_URL}/news/tags/patch-notes/")
+PATCH_DETAIL_URL = os.getenv("PATCH_DETAIL_URL", f"{BASE_URL}/news/game-updates/patch-{{version}}-notes/")
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://65.21.183.21:2556")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "phi4-mini")
 
@@ -62,6 +69,8 @@ def find_patch_version():
 
 # Simple in-memory cache for parsed bundle per version
 _BUNDLE_CACHE: dict[str, dict] = {}
+# Structured change records per version, filled alongside the bundle
+_CHANGES_CACHE: dict[str, tuple] = {}
 
 
 def get_patch(patch_version):
@@ -73,8 +82,34 @@ def get_patch(patch_version):
     r = requests.get(url, allow_redirects=True)
     r.raise_for_status()
 
-    with open(f'patch-{patch_version}.html', 'w', encoding='utf-8') as f:
+    # Write via a temp file so an interrupted download never leaves a truncated archive entry
+    tmp = f'patch-{patch_version}.html.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
         f.write(r.text)
+    os.replace(tmp, f'patch-{patch_version}.html')
+
+
+def extract_index_versions(html: str) -> list[str]:
+    """Return dashed versions from a patch-notes index page in page order, without duplicates."""
+    soup = BeautifulSoup(html, 'html.parser')
+    versions = []
+    seen = set()
+
+    for title_div in soup.find_all('div', attrs={'data-testid': 'card-title'}):
+        text = title_div.get_text(strip=True)
+        if not text:
+            continue
+        m = re.search(r"(\d+\.\d+)", text)
+        if not m:
+            continue
+        dotted = m.group(1)
+        dashed = dotted.replace('.', '-')
+        if dashed in seen:
+            continue
+        seen.add(dashed)
+        versions.append(dashed)
+
+    return versions
 
 
 def list_patch_versions(limit: int = 3):
@@ -83,26 +118,7 @@ def list_patch_versions(limit: int = 3):
         response = requests.get(PATCH_NOTES_URL)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        versions = []
-        seen = set()
-
-        for title_div in soup.find_all('div', attrs={'data-testid': 'card-title'}):
-            text = title_div.get_text(strip=True)
-            if not text:
-                continue
-            m = re.search(r"(\d+\.\d+)", text)
-            if not m:
-                continue
-            dotted = m.group(1)
-            dashed = dotted.replace('.', '-')
-            if dashed in seen:
-                continue
-            seen.add(dashed)
-            versions.append(dashed)
-            if len(versions) >= max(1, int(limit)):
-                break
-
+        versions = extract_index_versions(response.text)[:max(1, int(limit))]
         return {"versions": versions}
     except requests.exceptions.RequestException as e:
         print(f"Error fetching versions: {e}")
@@ -112,6 +128,21 @@ def list_patch_versions(limit: int = 3):
         return {"versions": []}
 
 
+def version_key(patch_version: str) -> tuple:
+    """Sort key for dashed versions so that "25-9" comes before "25-10"."""
+    return tuple(int(p) for p in re.findall(r"\d+", patch_version or ""))
+
+
+def list_archived_versions() -> list[str]:
+    """Return versions whose patch HTML is already downloaded to the working directory, oldest first."""
+    versions = []
+    for filename in os.listdir('.'):
+        m = re.fullmatch(r"patch-(\d+-\d+)\.html", filename)
+        if m:
+            versions.append(m.group(1))
+    return sorted(versions, key=version_key)
+
+
 def _ensure_patch_file(patch_version):
     """Ensure the patch HTML file exists; download it if missing. Returns True if file exists."""
     filename = f'patch-{patch_version}.html'
@@ -221,8 +252,13 @@ def parse_items(patch_version):
         print(f"Error parsing items: {e}")
         return {"items": {}}
 
-def parse_other(patch_version):
-    """Parse all other sections from the patch notes."""
+def get_section_key(h2) -> str:
+    """Stable key for an h2 section, e.g. "champions" or "arena"."""
+    return h2.get('id', '').replace('patch-', '') or h2.get_text(strip=True).lower()
+
+
+def parse_other(patch_version, only: set[str] | None = None):
+    """Parse all other sections from the patch notes (or just the section keys in `only`)."""
     try:
         if not patch_version:
             print("No patch_version provided to parse_other")
@@ -243,7 +279,9 @@ def parse_other(patch_version):
             if heading_text.lower() in ['champions', 'items']:
                 continue
 
-            section_key = h2.get('id', '').replace('patch-', '') or heading_text.lower()
+            section_key = get_section_key(h2)
+            if only is not None and section_key not in only:
+                continue
 
             if h2.get('id', '') == 'patch-patch-highlights':
                 highlights_div = h2.parent.find_next_sibling('div', class_='content-border')
@@ -544,13 +582,153 @@ def parse_highlights(patch_version: str):
         return {"highlights": {"image": None, "alt": "", "caption": ""}}
 
 
-def get_bundle(patch_version: str) -> dict:
-    """Aggregate all parsed data for a version, with simple caching."""
-    if not patch_version:
-        return {}
-    if patch_version in _BUNDLE_CACHE:
-        return _BUNDLE_CACHE[patch_version]
+@dataclass(slots=True, frozen=True)
+class ChangeRecord:
+    """One numeric "X \u21d2 Y" change extracted from a patch-notes bullet."""
+    section: str
+    entity: str
+    ability: str
+    stat: str
+    before: float | None
+    after: float | None
+    unit: str
+    direction: str  # "buff" | "nerf" | "adjustment"
+
+
+CHANGE_DIRECTIONS = ("buff", "nerf", "adjustment")
+
+_ARROW_RE = re.compile(r"\s*(?:\u21d2|->)\s*")
+_NUMBER = r"-?\d+(?:\.\d+)?"
+# A level range such as "600 \u2013 2200", a single value, or a per-rank run such as "8/9/10"
+_VALUE_RUN_RE = re.compile(
+    rf"(?P<lo>{_NUMBER})\s*[\u2013\u2014-]\s*(?P<hi>{_NUMBER})|{_NUMBER}(?:\s*/\s*{_NUMBER})*"
+)
+# Stats where a smaller number is the better outcome for the player
+_LOWER_IS_BETTER = ("cooldown", "cost", "cast time", "recharge", "delay", "lockout")
+
+
+def _value_and_unit(text: str):
+    """Return (mean numeric value, unit) for one side of a change, ignoring parenthesised ratios.
+
+    Per-rank runs average their ranks and level ranges take their midpoint.
+    """
+    text = re.sub(r"\(.*?\)", "", text)
+    text = re.sub(r"(?<=\d),(?=\d{3})", "", text)
+    m = _VALUE_RUN_RE.search(text)
+    if not m:
+        return None, ""
+    if m.group('lo') is not None:
+        numbers = [float(m.group('lo')), float(m.group('hi'))]  # level range: midpoint
+    else:
+        numbers = [float(n) for n in m.group(0).split('/')]
+    # The unit is the words right after the value, up to any further number
+    rest = re.split(r"[\d\u2013\u2014]", text[m.end():], maxsplit=1)[0]
+    unit = " ".join(rest.split()[:3]).strip(" .,;-")
+    return sum(numbers) / len(numbers), unit
+
+
+def parse_change_line(text: str):
+    """Split a bullet like "Cooldown: 10/9/8 seconds \u21d2 9/8/7 seconds".
+
+    Returns (stat, before, after, unit, direction) or None if the text has no arrow.
+    """
+    parts = _ARROW_RE.split(text.strip(), maxsplit=1)
+    if len(parts) != 2:
+        return None
+    left, right = parts
+
+    if ':' in left:
+        stat, before_text = left.split(':', 1)
+    else:
+        m = _VALUE_RUN_RE.search(left)
+        stat, before_text = (left[:m.start()], left[m.start():]) if m else ("", left)
+
+    before, before_unit = _value_and_unit(before_text)
+    after, after_unit = _value_and_unit(right)
+    stat = stat.strip(" :")
+    return stat, before, after, after_unit or before_unit, change_direction(stat, before, after)
+
+
+def change_direction(stat: str, before: float | None, after: float | None) -> str:
+    """Classify a numeric change as "buff", "nerf" or "adjustment" from the player's point of view."""
+    if before is None or after is None or before == after:
+        return "adjustment"
+    higher = after > before
+    if before < 0 and after < 0:
+        higher = abs(after) > abs(before)  # e.g. a slow going from -20% to -30% is stronger
+    if any(k in stat.lower() for k in _LOWER_IS_BETTER):
+        higher = not higher
+    return "buff" if higher else "nerf"
+
+
+def _li_own_text(li) -> str:
+    """Text of a <li> without any nested lists."""
+    parts = []
+    for content in li.contents:
+        if not hasattr(content, 'get_text'):
+            parts.append(str(content))
+        elif content.name not in ('ul', 'ol'):
+            parts.append(content.get_text())
+    return ''.join(parts).strip()
+
+
+def extract_change_records(soup) -> list[ChangeRecord]:
+    """Walk every h2 section and collect ChangeRecords from its "X \u21d2 Y" bullets."""
+    records = []
+    for h2 in soup.find_all('h2'):
+        key = get_section_key(h2)
+        current = h2.parent.find_next_sibling()
+
+        while current:
+            if current.name == 'h2' or (current.name == 'header' and current.find('h2')):
+                break
+
+            if current.name == 'div' and 'content-border' in current.get('class', []):
+                # Champion blocks have an h3 title with h4 ability headings; item blocks only h4 titles
+                has_h3 = current.find('h3', class_=['change-title', 'change-detail-title']) is not None
+                entity, ability = "", ""
+                for el in current.find_all(['h3', 'h4', 'li']):
+                    if el.name == 'li':
+                        parsed = parse_change_line(_li_own_text(el)) if entity else None
+                        if parsed:
+                            records.append(ChangeRecord(key, entity, ability, *parsed))
+                    elif el.name == 'h3' or not has_h3:
+                        title_link = el.find('a')
+                        entity = title_link.get_text(strip=True) if title_link else el.get_text(strip=True)
+                        ability = ""
+                    else:
+                        ability = el.get_text(' ', strip=True)
+
+            current = current.find_next_sibling()
 
+    return records
+
+
+def parse_change_records(patch_version: str) -> list[ChangeRecord]:
+    """Parse structured numeric change records from the patch notes."""
+    try:
+        if not patch_version:
+            print("No patch_version provided to parse_change_records")
+            return []
+
+        if not _ensure_patch_file(patch_version):
+            return []
+
+        with open(f'patch-{patch_version}.html', 'r', encoding='utf-8') as file:
+            soup = BeautifulSoup(file, 'html.parser')
+
+        return extract_change_records(soup)
+    except Exception as e:
+        print(f"Error parsing change records: {e}")
+        return []
+
+
+def build_bundle(patch_version: str) -> tuple[dict, list[tuple]]:
+    """Run every parser for a version without touching the caches.
+
+    Returns (bundle, change rows) where rows are plain ChangeRecord field tuples, which keeps
+    the result cheap to pickle when this runs in a worker process.
+    """
     # Ensure HTML exists (parsers already call this, but cheap double-check)
     _ensure_patch_file(patch_version)
 
@@ -561,6 +739,7 @@ def get_bundle(patch_version: str) -> dict:
     mentions = collect_arena_everywhere(patch_version).get("arena_mentions", [])
     tagline = parse_tagline(patch_version).get("tagline")
     highlights = parse_highlights(patch_version).get("highlights", {"image": None, "alt": "", "caption": ""})
+    highlights = images.localize_highlights(patch_version, highlights)
 
     bundle = {
         "version": patch_version,
@@ -571,10 +750,186 @@ def get_bundle(patch_version: str) -> dict:
         "tagline": tagline,
         "highlights": highlights,
     }
+    rows = [astuple(r) for r in parse_change_records(patch_version)]
+    return bundle, rows
+
+
+def store_bundle(patch_version: str, bundle: dict, rows: list[tuple]) -> dict:
+    """Cache a built bundle and its change rows."""
     _BUNDLE_CACHE[patch_version] = bundle
+    _CHANGES_CACHE[patch_version] = tuple(ChangeRecord(*row) for row in rows)
     return bundle
 
 
+def get_bundle(patch_version: str) -> dict:
+    """Aggregate all parsed data for a version, with simple caching."""
+    if not patch_version:
+        return {}
+    if patch_version in _BUNDLE_CACHE:
+        return _BUNDLE_CACHE[patch_version]
+    return store_bundle(patch_version, *build_bundle(patch_version))
+
+
+def forget_version(patch_version: str):
+    """Drop every cached parse result for a version so the next request re-reads its HTML."""
+    _BUNDLE_CACHE.pop(patch_version, None)
+    _CHANGES_CACHE.pop(patch_version, None)
+    forget_summary(patch_version)
+
+
+def forget_summary(patch_version: str):
+    with _SUMMARY_LOCK:
+        _SUMMARY_CACHE.pop(patch_version, None)
+        _SUMMARY_FAILED_AT.pop(patch_version, None)
+
+
+def get_change_records(patch_version: str) -> tuple[ChangeRecord, ...]:
+    """Return the cached ChangeRecords for a version, building the bundle first if needed."""
+    if not patch_version:
+        return ()
+    if patch_version not in _CHANGES_CACHE:
+        get_bundle(patch_version)
+    if patch_version not in _CHANGES_CACHE:
+        _CHANGES_CACHE[patch_version] = tuple(parse_change_records(patch_version))
+    return _CHANGES_CACHE[patch_version]
+
+
+def get_changes(patch_version: str, direction: str | None = None, section: str | None = None) -> dict:
+    """Return the structured change records for a version, optionally filtered.
+
+    Records are extracted once when the bundle is built and served from memory afterwards.
+    """
+    records = get_change_records(patch_version)
+    if direction:
+        records = [r for r in records if r.direction == direction]
+    if section:
+        records = [r for r in records if r.section == section]
+    return {"version": patch_version, "changes": [asdict(r) for r in records]}
+
+
+SUMMARY_MAX_WORDS = 22
+# Seconds before retrying the LLM for a version after a failed call
+SUMMARY_RETRY_AFTER = int(os.getenv("SUMMARY_RETRY_AFTER", "300"))
+_MODE_NAMES = {
+    "arena": "Arena", "aram": "ARAM", "swarm": "Swarm", "urf": "URF",
+    "ranked": "Ranked", "clash": "Clash", "brawl": "Brawl", "one for all": "One for All",
+}
+_CHANGE_KEYWORDS = (
+    "buff", "nerf", "increase", "decrease", "reduce", "longer", "shorter",
+    "higher", "lower", "faster", "slower", "more", "less", "rework",
+)
+_DIRECTION_LABELS = {"buff": "buffs", "nerf": "nerfs", "adjustment": "adjustments"}
+
+# LLM one-liners per version, filled in the background
+_SUMMARY_CACHE: dict[str, str] = {}
+_SUMMARY_PENDING: set[str] = set()
+_SUMMARY_FAILED_AT: dict[str, float] = {}
+_SUMMARY_LOCK = threading.Lock()
+_SUMMARY_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-summary")
+
+
+def _one_sentence(text: str, max_words: int = SUMMARY_MAX_WORDS) -> str:
+    """Normalize whitespace and enforce a single sentence of at most max_words words."""
+    # take first line only
+    one = str(text).strip().split("\n", 1)[0]
+    one = " ".join(one.split())
+    words = one.split()
+    if len(words) > max_words:
+        one = " ".join(words[:max_words]).rstrip(",;:") + "."
+    # ensure trailing period
+    if not one.endswith(('.', '!', '?')):
+        one = one.rstrip(",;:") + "."
+    return one
+
+
+def _verdict(records) -> str:
+    """Majority direction of an entity's change records as a plural noun."""
+    counts = {"buff": 0, "nerf": 0, "adjustment": 0}
+    for r in records:
+        counts[r.direction] += 1
+    if counts["buff"] and counts["nerf"]:
+        return _DIRECTION_LABELS["adjustment"]
+    return _DIRECTION_LABELS[max(counts, key=counts.get)] if any(counts.values()) else "changes"
+
+
+def summarize_extractive(patch_version: str) -> str:
+    """Deterministic one-liner built from the parsed bundle, ranking entities by change volume.
+
+    Champions and items are scored by numeric change records and buff/nerf wording; game
+    modes are picked up from other section names and Arena mentions.
+    """
+    bundle = get_bundle(patch_version)
+    by_entity: dict[str, list] = {}
+    for r in get_change_records(patch_version):
+        by_entity.setdefault(r.entity, []).append(r)
+
+    def score(name, text):
+        lowered = text.lower()
+        return 2 * len(by_entity.get(name, ())) + sum(lowered.count(k) for k in _CHANGE_KEYWORDS)
+
+    champions = bundle.get("champions", {})
+    items = bundle.get("items", {})
+    top_champions = sorted(champions, key=lambda n: -score(n, champions[n] or ""))[:2]
+    top_items = sorted(items, key=lambda n: -score(n, " ".join(items[n] or [])))[:1]
+
+    mode_text = " ".join(bundle.get("other", {}).keys()).lower()
+    if bundle.get("arena", {}).get("arena"):
+        mode_text += " arena"
+    modes = [name for k, name in _MODE_NAMES.items() if k in mode_text][:1]
+
+    parts = []
+    if top_champions:
+        parts.append(" and ".join(f"{n} {_verdict(by_entity.get(n, ()))}" for n in top_champions))
+    if top_items:
+        parts.append(f"{top_items[0]} {_verdict(by_entity.get(top_items[0], ()))}")
+    if modes:
+        parts.append(f"{modes[0]} updates")
+
+    if not parts:
+        return "Minor balance and quality-of-life tweaks."
+    if len(parts) > 1:
+        parts[-1] = f"plus {parts[-1]}"
+    return _one_sentence(", ".join(parts))
+
+
+def _refresh_llm_summary(patch_version: str):
+    try:
+        result = generate_one_liner_summary(patch_version)
+        with _SUMMARY_LOCK:
+            if result.get("summary"):
+                _SUMMARY_CACHE[patch_version] = result["summary"]
+                _SUMMARY_FAILED_AT.pop(patch_version, None)
+            else:
+                print(f"LLM summary for {patch_version} failed: {result.get('error')}")
+                _SUMMARY_FAILED_AT[patch_version] = time.time()
+    finally:
+        with _SUMMARY_LOCK:
+            _SUMMARY_PENDING.discard(patch_version)
+
+
+def get_summary(patch_version: str) -> dict:
+    """Return the LLM one-liner if ready, otherwise the extractive one and start the LLM call in the background.
+
+    Returns {"summary": str | None, "source": "llm" | "extractive", "extractive": bool}; never waits on Ollama.
+    """
+    if not patch_version:
+        return {"summary": None, "error": "missing patch_version"}
+
+    with _SUMMARY_LOCK:
+        if patch_version in _SUMMARY_CACHE:
+            return {"summary": _SUMMARY_CACHE[patch_version], "source": "llm", "extractive": False}
+        failed_at = _SUMMARY_FAILED_AT.get(patch_version)
+        should_start = patch_version not in _SUMMARY_PENDING and (
+            failed_at is None or time.time() - failed_at > SUMMARY_RETRY_AFTER
+        )
+        if should_start:
+            _SUMMARY_PENDING.add(patch_version)
+    if should_start:
+        _SUMMARY_EXECUTOR.submit(_refresh_llm_summary, patch_version)
+
+    return {"summary": summarize_extractive(patch_version), "source": "extractive", "extractive": True}
+
+
 def generate_one_liner_summary(patch_version: str):
     """Generate a concise one-liner summary of changes using an Ollama LLM.
 
@@ -585,9 +940,10 @@ def generate_one_liner_summary(patch_version: str):
             return {"summary": None, "error": "missing patch_version"}
 
         # small context: concise snippets from champions/items plus section names (no tagline)
-        champs_dict = parse_champions(patch_version).get("champions", {})
-        items_dict = parse_items(patch_version).get("items", {})
-        other_sections = list(parse_other(patch_version).keys())
+        bundle = get_bundle(patch_version)
+        champs_dict = bundle.get("champions", {})
+        items_dict = bundle.get("items", {})
+        other_sections = list(bundle.get("other", {}).keys())
 
         # Champion samples (up to 3): "Brand — Passive damage to monsters increased; Q stun duration increased; R cooldown decreased."
         champ_samples = []
@@ -637,17 +993,7 @@ def generate_one_liner_summary(patch_version: str):
         # Common Ollama /api/generate response contains 'response'
         text = data.get("response") or data.get("message") or None
         if text:
-            # normalize whitespace and enforce single sentence + <= 22 words
-            one = " ".join(str(text).strip().split())
-            # take first line only
-            one = one.split("\n", 1)[0].strip()
-            words = one.split()
-            if len(words) > 22:
-                one = " ".join(words[:22]).rstrip(",;:") + "."
-            # ensure trailing period
-            if not one.endswith(('.', '!', '?')):
-                one = one.rstrip(",;:") + "."
-            return {"summary": one}
+            return {"summary": _one_sentence(str(text))}
         return {"summary": None, "error": "no response text"}
     except requests.exceptions.RequestException as e:
         return {"summary": None, "error": f"ollama request failed: {e}"}
@@ -0,0 +1,282 @@
+"""Webhook subscriptions and push fan-out of a compact digest when a new patch is ingested."""
+import hashlib
+import hmac
+import ipaddress
+import json
+import os
+import random
+import secrets
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+import urllib3
+
+from . import utils
+
+WEBHOOK_STORE = os.getenv("WEBHOOK_STORE", "subscriptions.json")
+WEBHOOK_CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY", "8"))
+WEBHOOK_RETRIES = int(os.getenv("WEBHOOK_RETRIES", "3"))
+WEBHOOK_BACKOFF = float(os.getenv("WEBHOOK_BACKOFF", "2.0"))
+WEBHOOK_TIMEOUT = float(os.getenv("WEBHOOK_TIMEOUT", "5"))
+WEBHOOK_POLL_INTERVAL = int(os.getenv("WEBHOOK_POLL_INTERVAL", "900"))
+# Listing subscriptions is disabled unless an admin token is configured
+WEBHOOK_ADMIN_TOKEN = os.getenv("WEBHOOK_ADMIN_TOKEN")
+# Private, loopback and link-local targets are refused unless explicitly allowed (e.g. for local testing)
+WEBHOOK_ALLOW_PRIVATE = os.getenv("WEBHOOK_ALLOW_PRIVATE", "0") == "1"
+
+_STORE_LOCK = threading.Lock()
+# Precomputed digest body per version, so every subscriber gets the same bytes
+_DIGEST_CACHE: dict[str, bytes] = {}
+
+
+def _load_store() -> dict:
+    if not os.path.exists(WEBHOOK_STORE):
+        return {"subscriptions": {}, "last_version": None}
+    with open(WEBHOOK_STORE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_store(store: dict):
+    tmp = f"{WEBHOOK_STORE}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(store, f, indent=2)
+    os.replace(tmp, WEBHOOK_STORE)
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def mask_url(url: str) -> str:
+    """Keep only scheme and host: webhook paths often embed a bearer token (e.g. Discord's)."""
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    if parts.port:
+        host = f"{host}:{parts.port}"
+    return f"{parts.scheme}://{host}/***"
+
+
+def _public(sub: dict) -> dict:
+    """Subscription view without credentials: no secret or token hash, and a masked URL."""
+    view = {k: v for k, v in sub.items() if k not in ('secret', 'token_hash')}
+    view["url"] = mask_url(sub["url"])
+    return view
+
+
+def resolve_target(url: str) -> str:
+    """Resolve a webhook URL's host and return the address to connect to.
+
+    Raises ValueError unless the URL is http(s) and every address its host resolves to is public.
+    """
+    if not url or not url.startswith(("http://", "https://")):
+        raise ValueError("url must be an http(s) URL")
+    host = urlsplit(url).hostname
+    if not host:
+        raise ValueError("url must include a host")
+    try:
+        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    except socket.gaierror as e:
+        raise ValueError(f"cannot resolve {host}: {e}")
+    addrs = [ipaddress.ip_address(info[4][0].split('%')[0]) for info in infos]
+    if not addrs:
+        raise ValueError(f"cannot resolve {host}")
+    if not WEBHOOK_ALLOW_PRIVATE and any(not a.is_global or a.is_multicast for a in addrs):
+        raise ValueError(f"{host} resolves to a non-public address")
+    return str(addrs[0])
+
+
+def _pinned_pool(url: str, address: str) -> urllib3.HTTPConnectionPool:
+    """Connection pool that dials the validated address while keeping the URL's host for
+    the Host header, SNI and certificate checks, so a re-resolution can't redirect the POST."""
+    parts = urlsplit(url)
+    if parts.scheme == "https":
+        return urllib3.HTTPSConnectionPool(
+            address, parts.port or 443, server_hostname=parts.hostname, assert_hostname=parts.hostname,
+            cert_reqs="CERT_REQUIRED", ca_certs=requests.certs.where(), retries=False,
+        )
+    return urllib3.HTTPConnectionPool(address, parts.port or 80, retries=False)
+
+
+def check_admin_token(token: str | None) -> bool:
+    return bool(WEBHOOK_ADMIN_TOKEN and token and hmac.compare_digest(token, WEBHOOK_ADMIN_TOKEN))
+
+
+def add_subscription(url: str, secret: str | None = None) -> dict:
+    """Register a webhook URL.
+
+    The returned management token is shown only once and is required to delete the
+    subscription. Re-registering an existing URL returns it without a token.
+    """
+    resolve_target(url)
+    with _STORE_LOCK:
+        store = _load_store()
+        for sub in store["subscriptions"].values():
+            if sub["url"] == url:
+                return _public(sub)
+        token = secrets.token_urlsafe(24)
+        sub = {
+            "id": uuid.uuid4().hex, "url": url, "secret": secret, "token_hash": _hash_token(token),
+            "failures": 0, "last_error": None,
+        }
+        store["subscriptions"][sub["id"]] = sub
+        _save_store(store)
+    return {**_public(sub), "token": token}
+
+
+def remove_subscription(sub_id: str, token: str | None) -> bool:
+    """Delete a subscription given its management token (or the admin token)."""
+    with _STORE_LOCK:
+        store = _load_store()
+        sub = store["subscriptions"].get(sub_id)
+        if sub is None:
+            return False
+        owner = token and sub.get("token_hash") and hmac.compare_digest(_hash_token(token), sub["token_hash"])
+        if not (owner or check_admin_token(token)):
+            return False
+        del store["subscriptions"][sub_id]
+        _save_store(store)
+    return True
+
+
+def list_subscriptions() -> dict:
+    with _STORE_LOCK:
+        store = _load_store()
+    return {"subscriptions": [_public(s) for s in store["subscriptions"].values()]}
+
+
+def build_digest(patch_version: str, top: int = 5) -> bytes:
+    """Compact JSON digest for a version: tagline, most-changed champions/items and the one-liner summary."""
+    if patch_version in _DIGEST_CACHE:
+        return _DIGEST_CACHE[patch_version]
+
+    bundle = utils.get_bundle(patch_version)
+    counts: dict[str, int] = {}
+    for r in utils.get_change_records(patch_version):
+        counts[r.entity] = counts.get(r.entity, 0) + 1
+
+    champions = bundle.get("champions", {})
+    items = bundle.get("items", {})
+    top_champions = sorted(champions, key=lambda name: -counts.get(name, 0))[:top]
+    top_items = sorted(items, key=lambda name: -counts.get(name, 0))[:top]
+
+    digest = {
+        "version": patch_version,
+        "tagline": bundle.get("tagline"),
+        "champions": [{"name": n, "summary": champions[n]} for n in top_champions],
+        "items": [{"name": n, "changes": (items[n] or [])[:2]} for n in top_items],
+        # Cached summary (or the extractive fallback); never waits on the LLM
+        "summary": utils.get_summary(patch_version).get("summary"),
+    }
+    body = json.dumps(digest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    _DIGEST_CACHE[patch_version] = body
+    return body
+
+
+def forget_version(patch_version: str):
+    """Drop a version's precomputed digest."""
+    _DIGEST_CACHE.pop(patch_version, None)
+
+
+def _deliver(sub: dict, body: bytes, patch_version: str) -> tuple[str, str | None]:
+    """POST the digest to one subscriber, retrying with exponential backoff and jitter.
+
+    Returns (subscription id, error or None).
+    """
+    headers = {"Content-Type": "application/json", "X-Patch-Version": patch_version}
+    if sub.get("secret"):
+        sig = hmac.new(sub["secret"].encode('utf-8'), body, hashlib.sha256).hexdigest()
+        headers["X-Signature-SHA256"] = sig
+
+    try:
+        # Re-checked on every delivery: the host may resolve differently than at registration
+        address = resolve_target(sub["url"])
+    except ValueError as e:
+        return sub["id"], str(e)
+    parts = urlsplit(sub["url"])
+    headers["Host"] = parts.netloc.rpartition('@')[2]
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+
+    error = None
+    pool = _pinned_pool(sub["url"], address)
+    for attempt in range(WEBHOOK_RETRIES + 1):
+        if attempt:
+            # Subscribers that already failed before start further back
+            delay = WEBHOOK_BACKOFF * 2 ** (attempt - 1 + min(sub.get("failures", 0), 4))
+            time.sleep(delay * random.uniform(0.5, 1.0))
+        try:
+            r = pool.urlopen("POST", path, body=body, headers=headers, redirect=False, timeout=WEBHOOK_TIMEOUT)
+            if r.status < 300:
+                return sub["id"], None
+            error = f"HTTP {r.status}"
+            if 400 <= r.status < 500 and r.status != 429:
+                break  # client errors won't fix themselves on retry
+        except urllib3.exceptions.HTTPError as e:
+            error = str(e)
+    pool.close()
+    return sub["id"], error
+
+
+def dispatch(patch_version: str, body: bytes) -> dict:
+    """Deliver one digest to every subscriber through a bounded pool; records per-subscriber failures."""
+    with _STORE_LOCK:
+        subs = list(_load_store()["subscriptions"].values())
+    if not subs:
+        return {"delivered": 0, "failed": 0}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(WEBHOOK_CONCURRENCY, len(subs)))) as pool:
+        results = list(pool.map(lambda s: _deliver(s, body, patch_version), subs))
+
+    with _STORE_LOCK:
+        store = _load_store()
+        for sub_id, error in results:
+            sub = store["subscriptions"].get(sub_id)
+            if sub is None:
+                continue
+            sub["failures"] = sub.get("failures", 0) + 1 if error else 0
+            sub["last_error"] = error
+        _save_store(store)
+
+    failed = sum(1 for _, error in results if error)
+    print(f"Webhook dispatch for {patch_version}: {len(results) - failed} delivered, {failed} failed")
+    return {"delivered": len(results) - failed, "failed": failed}
+
+
+def notify_new_version(patch_version: str) -> dict | None:
+    """Push the digest once per new version; returns the dispatch result or None if already sent."""
+    if not patch_version or not utils._ensure_patch_file(patch_version):
+        return None
+    with _STORE_LOCK:
+        if _load_store().get("last_version") == patch_version:
+            return None
+    result = dispatch(patch_version, build_digest(patch_version))
+    # Recorded only after the fan-out, so a failed digest or a crash mid-dispatch is retried next poll
+    with _STORE_LOCK:
+        store = _load_store()
+        store["last_version"] = patch_version
+        _save_store(store)
+    return result
+
+
+def _watch(interval: int):
+    while True:
+        try:
+            notify_new_version(utils.find_patch_version())
+        except Exception as e:
+            print(f"Webhook watcher error: {e}")
+        time.sleep(interval)
+
+
+def start_watcher(interval: int = WEBHOOK_POLL_INTERVAL):
+    """Poll upstream once per interval in a daemon thread and push new patches to subscribers."""
+    if interval <= 0:
+        return None
+    t = threading.Thread(target=_watch, args=(interval,), name="webhook-watcher", daemon=True)
+    t.start()
+    return t
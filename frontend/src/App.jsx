@@ -1,4 +1,4 @@
-import React, { useEffect, useMemo, useState } from "react";
+import React, { useEffect, useMemo, useRef, useState } from "react";
 import Section from "./components/Section.jsx";
 import { Tabs } from "./components/Tabs.jsx";
 
@@ -13,6 +13,31 @@ async function fetchJSON(path) {
   return res.json();
 }
 
+// Hero images are served by the API from its local cache as relative paths
+function apiAsset(url) {
+  return url?.startsWith("/") ? `${API}${url}` : url;
+}
+
+function apiSrcSet(srcset) {
+  return srcset
+    ?.split(", ")
+    .map((candidate) => apiAsset(candidate))
+    .join(", ");
+}
+
+// The API answers at once with an extractive summary and swaps in the LLM one-liner
+// when it is ready, so re-check a few times while the answer is still extractive.
+async function fetchSummary(path, onSummary, isCurrent) {
+  let sm = await fetchJSON(path);
+  if (isCurrent()) onSummary(sm?.summary || "");
+  for (let i = 0; sm?.extractive && i < 3; i++) {
+    await new Promise((resolve) => setTimeout(resolve, 5000));
+    if (!isCurrent()) return;
+    sm = await fetchJSON(path);
+    if (isCurrent() && !sm?.extractive && sm?.summary) onSummary(sm.summary);
+  }
+}
+
 export default function App() {
   const [patchVersion, setPatchVersion] = useState("");
   const [loading, setLoading] = useState(true);
@@ -35,6 +60,11 @@ export default function App() {
     return String(patchVersion).replace(/-/g, ".");
   }, [patchVersion]);
   const [availableVersions, setAvailableVersions] = useState([]);
+  const selectedRef = useRef("");
+  const showSummary = (text) => {
+    setAiSummary(text);
+    setAiLoading(false);
+  };
 
   useEffect(() => {
     let mounted = true;
@@ -73,8 +103,7 @@ export default function App() {
         if (mounted) {
           try {
             setAiLoading(true);
-            const sm = await fetchJSON("/summary/");
-            if (mounted) setAiSummary(sm?.summary || "");
+            await fetchSummary("/summary/", showSummary, () => mounted && !selectedRef.current);
           } catch (e) {
             if (mounted) setAiSummary("");
           } finally {
@@ -119,8 +148,12 @@ export default function App() {
       // Fetch summary in the background
       try {
         const dashed = String(dotted).replace(/\./g, "-");
-        const sm = await fetchJSON(`/summary/${dashed}`);
-        setAiSummary(sm?.summary || "");
+        selectedRef.current = dashed;
+        await fetchSummary(
+          `/summary/${dashed}`,
+          showSummary,
+          () => selectedRef.current === dashed
+        );
       } catch (e) {
         setAiSummary("");
       } finally {
@@ -147,7 +180,9 @@ export default function App() {
             {highlights?.image ? (
               <div>
                 <img
-                  src={highlights.image}
+                  src={apiAsset(highlights.image)}
+                  srcSet={apiSrcSet(highlights.srcset) || undefined}
+                  sizes="(max-width: 1100px) 100vw, 1100px"
                   alt={highlights.alt || "Patch Highlights"}
                   style={{
                     width: "100%",
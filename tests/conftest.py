@@ -1,5 +1,7 @@
 import os
 import sys
+import threading
+from http.server import ThreadingHTTPServer
 from pathlib import Path
 import pytest
 
@@ -14,11 +16,106 @@ if str(BACKEND_DIR) not in sys.path:
 
 
 @pytest.fixture(autouse=True)
-def _chdir_backend():
-    """Run tests with cwd=backend so relative file reads work."""
+def _chdir_backend(monkeypatch):
+    """Run tests with cwd=backend so relative file reads work; hero images are never fetched."""
+    from backend import images
+
+    monkeypatch.setattr(images, "IMAGE_CACHE", False)
+    monkeypatch.setenv("IMAGE_CACHE", "0")  # for parse workers, which import backend afresh
     old = os.getcwd()
     os.chdir(str(BACKEND_DIR))
     try:
         yield
     finally:
         os.chdir(old)
+
+
+def sample_patch_html(version: str, stun_after: str = "1.75") -> str:
+    """Minimal patch-notes page mirroring the structure of Riot's articles."""
+    return f"""<html><head>
+<meta name="description" content="Patch {version} notes">
+</head><body>
+<div data-testid="tagline">Patch {version}: Brand gets hotter</div>
+<header><h2 id="patch-patch-highlights">Patch Highlights</h2></header>
+<div class="content-border"><img src="https://cdn.example.com/hero-{version}.jpg" alt="Hero"><p>Arena returns</p></div>
+<header><h2 id="patch-champions">Champions</h2></header>
+<div class="content-border"><div>
+  <h3 class="change-title"><a href="#brand">Brand</a></h3>
+  <p class="summary">Stuns last longer and the ultimate comes up more often.</p>
+  <h4 class="change-detail-title ability-title">Q - Sear</h4>
+  <ul><li><strong>Stun duration:</strong> 1.5 ⇒ {stun_after} seconds</li></ul>
+  <h4 class="change-detail-title ability-title">R - Pyroclasm</h4>
+  <ul><li><strong>Cooldown:</strong> 105/90/75 seconds ⇒ 100/85/70 seconds</li></ul>
+</div></div>
+<div class="content-border"><div>
+  <h3 class="change-title"><a href="#kaisa">Kai'Sa</a></h3>
+  <p class="summary">Lower base damage.</p>
+  <ul><li><strong>Base AD:</strong> 59 ⇒ 57</li></ul>
+</div></div>
+<header><h2 id="patch-items">Items</h2></header>
+<div class="content-border"><div>
+  <h4 class="change-detail-title">Rabadon's Deathcap</h4>
+  <ul><li><strong>Cost:</strong> 3,600 gold ⇒ 3,500 gold</li><li><strong>Ability Power:</strong> 130 ⇒ 140</li></ul>
+</div></div>
+<header><h2 id="patch-arena">Arena</h2></header>
+<div class="content-border"><div>
+  <h4 class="change-title">Augments</h4>
+  <ul><li>Arena augments reworked</li></ul>
+</div></div>
+<header><h2 id="patch-bugfixes">Bugfixes</h2></header>
+<div class="content-border"><div>
+  <h4 class="change-title">Fixes</h4>
+  <ul><li>Fixed a tooltip typo</li></ul>
+</div></div>
+</body></html>"""
+
+
+@pytest.fixture
+def patch_html():
+    """The sample article builder, for tests that write or serve extra versions."""
+    return sample_patch_html
+
+
+@pytest.fixture
+def patch_archive(tmp_path, monkeypatch):
+    """Temporary archive with two sample patch files; cwd is switched to it and caches are reset."""
+    from backend import utils
+
+    (tmp_path / "patch-25-15.html").write_text(sample_patch_html("25-15", stun_after="1.6"), encoding="utf-8")
+    (tmp_path / "patch-25-16.html").write_text(sample_patch_html("25-16"), encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(utils, "_BUNDLE_CACHE", {})
+    monkeypatch.setattr(utils, "_CHANGES_CACHE", {})
+    return tmp_path
+
+
+@pytest.fixture
+def local_http_server():
+    """Start a loopback HTTP server for a request handler class; returns its base URL.
+
+    Request logging is silenced and every server started by the test is shut down afterwards.
+    """
+    servers = []
+
+    def start(handler) -> str:
+        quiet = type(handler.__name__, (handler,), {"log_message": lambda self, *args: None})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), quiet)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    """A fresh two-worker parse pool, shut down after the test."""
+    from backend import parsing
+
+    monkeypatch.setattr(parsing, "PARSE_WORKERS", 2)
+    monkeypatch.setattr(parsing, "_POOL", None)
+    yield
+    parsing.shutdown()
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+from backend import backfill, utils
+
+
+def _index_page(*dotted):
+    cards = "".join(f'<div data-testid="card-title">Patch {v} Notes</div>' for v in dotted)
+    return f"<html><body>{cards}</body></html>"
+
+
+def test_enumerate_versions_walks_pages_until_since(monkeypatch):
+    pages = {
+        backfill.index_page_url(1): _index_page("25.16", "25.15"),
+        backfill.index_page_url(2): _index_page("25.14", "25.13"),
+        backfill.index_page_url(3): _index_page("25.12"),
+    }
+    monkeypatch.setattr(
+        backfill.requests, "get",
+        lambda url, timeout: SimpleNamespace(text=pages.get(url, ""), raise_for_status=lambda: None),
+    )
+    assert backfill.enumerate_versions(limit=10, since="25-13") == ["25-16", "25-15", "25-14", "25-13"]
+    assert backfill.enumerate_versions(limit=3) == ["25-16", "25-15", "25-14"]
+
+
+def test_backfill_downloads_parses_and_resumes(patch_archive, patch_html, monkeypatch):
+    fetched = []
+
+    def fake_get_patch(v):
+        fetched.append(v)
+        (patch_archive / f"patch-{v}.html").write_text(patch_html(v), encoding="utf-8")
+
+    monkeypatch.setattr(utils, "get_patch", fake_get_patch)
+    out = str(patch_archive / "dist")
+
+    stats = backfill.backfill(["25-16", "25-15", "25-14"], out, concurrency=2, workers=2)
+    assert fetched == ["25-14"]
+    assert (stats["downloaded"], stats["parsed"], stats["skipped"]) == (1, 3, 0)
+    assert (patch_archive / "dist" / "bundle" / "25-14.json").exists()
+    assert (patch_archive / "dist" / "bundle" / "index.json").read_bytes() == (
+        patch_archive / "dist" / "bundle" / "25-16.json"
+    ).read_bytes()
+
+    again = backfill.backfill(["25-16", "25-15", "25-14"], out)
+    assert (again["downloaded"], again["parsed"], again["skipped"]) == (0, 0, 3)
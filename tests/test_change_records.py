@@ -0,0 +1,54 @@
+from backend import utils
+
+
+def test_parse_change_line_per_rank_cooldown_is_buff():
+    stat, before, after, unit, direction = utils.parse_change_line(
+        "Cooldown: 105/90/75 seconds ⇒ 100/85/70 seconds"
+    )
+    assert stat == "Cooldown"
+    assert before == 90.0 and after == 85.0
+    assert unit == "seconds"
+    assert direction == "buff"
+
+
+def test_parse_change_line_ignores_ratios_and_accepts_ascii_arrow():
+    stat, before, after, unit, direction = utils.parse_change_line("Damage: 80 (+ 60% AP) -> 70 (+ 60% AP)")
+    assert (stat, before, after, direction) == ("Damage", 80.0, 70.0, "nerf")
+
+
+def test_parse_change_line_level_ranges_take_the_midpoint():
+    for dash in ("\u2013", "-"):
+        stat, before, after, unit, direction = utils.parse_change_line(
+            f"Health: 600 {dash} 2200 (based on level) \u21d2 620 {dash} 2250 (based on level)"
+        )
+        assert (stat, before, after, unit, direction) == ("Health", 1400.0, 1435.0, "", "buff")
+
+    stat, before, after, unit, _ = utils.parse_change_line("Armor: 30-90 armor \u21d2 32-95 armor")
+    assert (before, after, unit) == (60.0, 63.5, "armor")
+
+
+def test_parse_change_line_negative_values_compare_magnitude():
+    stat, before, after, unit, direction = utils.parse_change_line("Slow: -20% \u21d2 -30%")
+    assert (before, after, unit, direction) == (-20.0, -30.0, "%", "buff")
+
+
+def test_parse_change_line_without_arrow():
+    assert utils.parse_change_line("New effect: grants a shield") is None
+
+
+def test_change_records_extracted_with_bundle(patch_archive):
+    utils.get_bundle("25-16")
+    data = utils.get_changes("25-16")
+    by_stat = {(c["entity"], c["stat"]): c for c in data["changes"]}
+
+    stun = by_stat[("Brand", "Stun duration")]
+    assert stun["ability"] == "Q - Sear"
+    assert stun["section"] == "champions"
+    assert stun["direction"] == "buff"
+
+    assert by_stat[("Kai'Sa", "Base AD")]["direction"] == "nerf"
+    cost = by_stat[("Rabadon's Deathcap", "Cost")]
+    assert (cost["before"], cost["after"], cost["unit"], cost["direction"]) == (3600.0, 3500.0, "gold", "buff")
+
+    nerfs = utils.get_changes("25-16", direction="nerf")["changes"]
+    assert [c["entity"] for c in nerfs] == ["Kai'Sa"]
@@ -0,0 +1,61 @@
+import pytest
+
+from backend import diff, utils
+
+
+@pytest.fixture
+def diff_cache(monkeypatch):
+    monkeypatch.setattr(diff, "_DIFF_CACHE", diff.OrderedDict())
+    monkeypatch.setattr(utils, "get_patch", lambda v: pytest.fail(f"diff downloaded {v}"))
+
+
+def test_diff_tracks_history_and_net_changes(patch_archive, diff_cache):
+    (patch_archive / "patch-25-14.html").write_text("<html></html>", encoding="utf-8")
+
+    d = diff.build_diff("25-14", "25-16")
+    assert d["versions"] == ["25-15", "25-16"]
+
+    brand = d["champions"]["Brand"]
+    assert [h["version"] for h in brand["history"]] == ["25-15", "25-16"]
+    assert brand["latest_version"] == "25-16"
+    stun = next(n for n in brand["net"] if n["stat"] == "Stun duration")
+    assert (stun["before"], stun["after"], stun["direction"]) == (1.5, 1.75, "buff")
+
+    assert d["items"]["Rabadon's Deathcap"]["latest"][0].startswith("Cost:")
+    assert d["other"]["arena"]["Augments"]["latest"] == ["Arena augments reworked"]
+
+    assert diff.build_diff("25-14", "25-16") is d
+    diff.forget_version("25-16")
+    assert diff.build_diff("25-14", "25-16") is not d
+
+
+def test_mode_sections_stay_out_of_champion_net(patch_archive, diff_cache):
+    html = (patch_archive / "patch-25-16.html").read_text(encoding="utf-8")
+    aram = (
+        '<header><h2 id="patch-aram">ARAM</h2></header>'
+        '<div class="content-border"><div><h4 class="change-detail-title">Brand</h4>'
+        '<ul><li><strong>Damage dealt:</strong> 100% \u21d2 90%</li></ul></div></div>'
+    )
+    (patch_archive / "patch-25-16.html").write_text(html.replace("</body>", aram + "</body>"), encoding="utf-8")
+
+    d = diff.build_diff("25-15", "25-16")
+    assert "Damage dealt" not in [n["stat"] for n in d["champions"]["Brand"]["net"]]
+
+
+def test_unarchived_versions_are_reported_not_downloaded(patch_archive, diff_cache, monkeypatch):
+    (patch_archive / "patch-25-12.html").write_text("<html></html>", encoding="utf-8")
+    (patch_archive / "patch-25-15.html").unlink()
+
+    d = diff.build_diff("25-12", "25-17")
+    assert d["versions"] == ["25-16"]
+    assert d["missing"] == ["25-13", "25-14", "25-15", "25-17"]
+
+
+def test_span_is_capped_and_cache_is_bounded(patch_archive, diff_cache, monkeypatch):
+    with pytest.raises(ValueError):
+        diff.versions_between("25-1", "25-99")
+
+    monkeypatch.setattr(diff, "DIFF_CACHE_MAX", 2)
+    for start in ("25-12", "25-13", "25-14"):
+        diff.build_diff(start, "25-16")
+    assert list(diff._DIFF_CACHE) == [("25-13", "25-16"), ("25-14", "25-16")]
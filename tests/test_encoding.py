@@ -0,0 +1,67 @@
+import msgpack
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import encoding, main, parsing
+
+
+def test_negotiate_prefers_highest_q_supported():
+    assert encoding.negotiate(None) == encoding.JSON
+    assert encoding.negotiate("*/*") == encoding.JSON
+    assert encoding.negotiate("application/x-msgpack") == encoding.MSGPACK
+    assert encoding.negotiate("application/json;q=0.5, application/msgpack") == encoding.MSGPACK
+    assert encoding.negotiate("text/html, application/msgpack;q=0") == encoding.JSON
+
+
+def test_endpoints_encode_once_per_version_and_format(patch_archive, monkeypatch):
+    cbor2 = pytest.importorskip("cbor2")
+    monkeypatch.setattr(parsing, "PARSE_WORKERS", 0)
+    monkeypatch.setattr(encoding, "_ENCODED_CACHE", {})
+    client = TestClient(main.app)
+
+    json_resp = client.get("/bundle/25-16")
+    assert json_resp.headers["content-type"] == "application/json"
+    assert json_resp.headers["vary"] == "Accept"
+
+    packed = client.get("/bundle/25-16", headers={"Accept": "application/msgpack"})
+    assert packed.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(packed.content) == json_resp.json()
+
+    cbor = client.get("/champions/25-16", headers={"Accept": "application/cbor"})
+    assert "Brand" in cbor2.loads(cbor.content)["champions"]
+
+    assert set(encoding._ENCODED_CACHE) == {
+        ("25-16", "bundle", encoding.JSON),
+        ("25-16", "bundle", encoding.MSGPACK),
+        ("25-16", "champions", encoding.CBOR),
+    }
+    encoding.forget_version("25-16")
+    assert encoding._ENCODED_CACHE == {}
+
+
+def test_encoded_cache_is_bounded_and_ignores_unknown_filters(patch_archive, monkeypatch):
+    monkeypatch.setattr(parsing, "PARSE_WORKERS", 0)
+    monkeypatch.setattr(encoding, "_ENCODED_CACHE", encoding.OrderedDict())
+    monkeypatch.setattr(encoding, "ENCODED_CACHE_MAX", 2)
+    client = TestClient(main.app)
+
+    assert client.get("/changes/25-16", params={"direction": "sideways"}).status_code == 400
+    assert client.get("/changes/25-16", params={"section": "random-junk"}).json()["changes"] == []
+    assert encoding._ENCODED_CACHE == {}
+
+    for resource in ("champions", "items", "tagline"):
+        client.get(f"/{resource}/25-16")
+    assert list(encoding._ENCODED_CACHE) == [("25-16", "items", encoding.JSON), ("25-16", "tagline", encoding.JSON)]
+
+
+def test_version_endpoints_are_negotiated_but_not_cached(monkeypatch):
+    monkeypatch.setattr(encoding, "_ENCODED_CACHE", encoding.OrderedDict())
+    monkeypatch.setattr(main.utils, "find_patch_version", lambda: "25-16")
+    monkeypatch.setattr(main.utils, "list_patch_versions", lambda limit=3: {"versions": ["25-16", "25-15"]})
+    client = TestClient(main.app)
+
+    assert client.get("/version/").json() == {"version": "25-16"}
+    packed = client.get("/versions/", headers={"Accept": "application/msgpack"})
+    assert packed.headers["vary"] == "Accept"
+    assert msgpack.unpackb(packed.content) == {"versions": ["25-16", "25-15"]}
+    assert len(encoding._ENCODED_CACHE) == 0
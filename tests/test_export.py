@@ -0,0 +1,33 @@
+import gzip
+import json
+
+import pytest
+
+from backend import export
+
+
+def test_export_renders_tree_and_skips_unchanged(patch_archive):
+    out = patch_archive / "dist"
+    result = export.export_all(str(out))
+    assert result == {"rendered": ["25-15", "25-16"], "skipped": []}
+
+    bundle = json.loads((out / "bundle" / "25-16.json").read_text(encoding="utf-8"))
+    assert bundle["version"] == "25-16"
+    assert (out / "bundle" / "index.json").read_bytes() == (out / "bundle" / "25-16.json").read_bytes()
+    assert gzip.decompress((out / "champions" / "25-15.json.gz").read_bytes()) == (
+        out / "champions" / "25-15.json"
+    ).read_bytes()
+    assert json.loads((out / "versions" / "index.json").read_text()) == {"versions": ["25-16", "25-15"]}
+    assert json.loads((out / "version" / "index.json").read_text()) == {"version": "25-16"}
+
+    (patch_archive / "patch-25-15.html").write_text("<html></html>", encoding="utf-8")
+    assert export.export_all(str(out)) == {"rendered": ["25-15"], "skipped": ["25-16"]}
+    assert json.loads((out / "champions" / "25-15.json").read_text()) == {"champions": {}}
+
+
+def test_export_writes_brotli_siblings(patch_archive):
+    brotli = pytest.importorskip("brotli")
+    out = patch_archive / "dist"
+    export.export_all(str(out))
+    for path in (out / "bundle" / "25-16.json", out / "bundle" / "index.json"):
+        assert brotli.decompress(path.with_name(path.name + ".br").read_bytes()) == path.read_bytes()
@@ -0,0 +1,60 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from backend import analytics, main, parsing, revalidate, utils, webhooks
+
+
+def test_heatmap_counts_and_intensity(patch_archive, monkeypatch):
+    monkeypatch.setattr(analytics, "_COLUMN_CACHE", {})
+    monkeypatch.setattr(analytics, "_HEATMAP_CACHE", {})
+
+    hm = analytics.build_heatmap(section="champions", window=2)
+    assert hm["versions"] == ["25-15", "25-16"]
+    assert hm["entities"] == ["Brand", "Kai'Sa"]
+    # Brand: longer stun + lower cooldown in both patches; Kai'Sa: one nerf each patch
+    assert hm["buffs"] == [[2, 2], [0, 0]]
+    assert hm["nerfs"] == [[0, 0], [1, 1]]
+    assert hm["rolling_intensity"][1][1] == round(hm["intensity"][1][0] + hm["intensity"][1][1], 3)
+
+    only_latest = analytics.build_heatmap(from_version="25-16")
+    assert only_latest["versions"] == ["25-16"]
+    assert "Rabadon's Deathcap" in only_latest["entities"]
+    assert analytics.build_heatmap(from_version="25-16") is only_latest
+
+
+def test_heatmap_rows_are_per_section(patch_archive, patch_html, monkeypatch):
+    monkeypatch.setattr(analytics, "_COLUMN_CACHE", {})
+    monkeypatch.setattr(analytics, "_HEATMAP_CACHE", {})
+    aram = """<header><h2 id="patch-aram-balance-changes">ARAM Balance Changes</h2></header>
+<div class="content-border"><div>
+  <h4 class="change-detail-title">Brand</h4>
+  <ul><li><strong>Damage dealt:</strong> 100% ⇒ 95%</li></ul>
+</div></div>
+</body>"""
+    (patch_archive / "patch-25-17.html").write_text(patch_html("25-17").replace("</body>", aram), encoding="utf-8")
+
+    hm = analytics.build_heatmap(from_version="25-17")
+    rows = list(zip(hm["sections"], hm["entities"]))
+    aram_row, sr_row = rows.index(("aram-balance-changes", "Brand")), rows.index(("champions", "Brand"))
+    assert (hm["buffs"][aram_row], hm["nerfs"][aram_row]) == ([0], [1])
+    assert (hm["buffs"][sr_row], hm["nerfs"][sr_row]) == ([2], [0])
+
+
+def test_startup_does_not_wait_for_the_heatmap(patch_archive, monkeypatch):
+    monkeypatch.setattr(parsing, "PARSE_WORKERS", 0)
+    monkeypatch.setattr(utils, "find_patch_version", lambda: "25-16")
+    monkeypatch.setattr(webhooks, "start_watcher", lambda: None)
+    monkeypatch.setattr(revalidate, "start_revalidator", lambda: None)
+    release, built = threading.Event(), threading.Event()
+
+    def slow_heatmap(*args):
+        release.wait(5)
+        built.set()
+
+    monkeypatch.setattr(analytics, "build_heatmap", slow_heatmap)
+    with TestClient(main.app) as client:
+        assert client.get("/tagline/25-16").status_code == 200
+        assert not built.is_set()
+        release.set()
+        assert built.wait(5)
@@ -0,0 +1,82 @@
+import io
+import json
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import export, images, main, parsing, utils
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture
+def cdn(patch_archive, local_http_server, monkeypatch):
+    """Local CDN serving a 2000px JPEG; the archived article points its hero image at it."""
+    buf = io.BytesIO()
+    Image.new("RGB", (2000, 1000), (200, 40, 40)).save(buf, "JPEG")
+    state = {"hits": 0, "body": buf.getvalue()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["hits"] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(state["body"])))
+            self.end_headers()
+            self.wfile.write(state["body"])
+
+    article = patch_archive / "patch-25-16.html"
+    article.write_text(
+        article.read_text(encoding="utf-8").replace("https://cdn.example.com", local_http_server(Handler)),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(images, "IMAGE_CACHE", True)
+    monkeypatch.setattr(parsing, "PARSE_WORKERS", 0)
+    return state
+
+
+def test_ingestion_caches_resized_variants_once(cdn):
+    highlights = utils.build_bundle("25-16")[0]["highlights"]
+    assert highlights["image"].startswith("/highlights/25-16/image?rev=")
+    assert highlights["source_image"].endswith("/hero-25-16.jpg")
+    assert [c.split()[-1] for c in highlights["srcset"].split(", ")] == ["480w", "960w", "1440w"]
+
+    utils.build_bundle("25-16")
+    assert cdn["hits"] == 1
+
+    path, media_type, _, _ = images.resolve("25-16", 500)
+    assert media_type == "image/webp"
+    with Image.open(path) as img:
+        assert img.size == (960, 480)
+
+
+def test_image_endpoint_serves_variants_with_etag(cdn):
+    client = TestClient(main.app)
+    srcset = client.get("/highlights/25-16").json()["highlights"]["srcset"]
+    resp = client.get(srcset.split(", ")[0].split()[0])  # the 480w candidate
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "image/webp"
+    assert "immutable" in resp.headers["cache-control"]
+    for params in ({"w": 400}, {"w": 400, "rev": "stale"}):
+        assert "immutable" not in client.get("/highlights/25-16/image", params=params).headers["cache-control"]
+    with Image.open(io.BytesIO(resp.content)) as img:
+        assert img.width == 480
+
+    cached = client.get("/highlights/25-16/image", params={"w": 400}, headers={"If-None-Match": resp.headers["etag"]})
+    assert cached.status_code == 304
+    assert len(client.get("/highlights/25-16/image").content) < len(cdn["body"])
+
+    images.IMAGE_CACHE = False  # restored by monkeypatch; 25-15 is parsed without fetching
+    assert client.get("/highlights/25-15/image").status_code == 404
+
+
+def test_static_export_writes_image_files(cdn, patch_archive):
+    out = patch_archive / "dist"
+    export.export_version(str(out), "25-16")
+    highlights = json.loads((out / "highlights" / "25-16.json").read_text())["highlights"]
+    assert highlights["image"] == "/highlights/25-16/image/1440.webp"
+    for candidate in highlights["srcset"].split(", "):
+        assert (out / candidate.split()[0].lstrip("/")).is_file()
+    bundle = json.loads((out / "bundle" / "25-16.json").read_text())
+    assert bundle["highlights"] == highlights
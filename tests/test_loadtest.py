@@ -0,0 +1,50 @@
+import requests
+
+from backend import loadtest, utils
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert loadtest.percentile(values, 50) == 50
+    assert loadtest.percentile(values, 99) == 99
+    assert loadtest.percentile([], 99) == 0.0
+
+
+def test_stubs_feed_the_parsers(patch_archive, monkeypatch):
+    riot = loadtest.start_stub(loadtest.StubConfig(), ["25-2", "25-1"])
+    try:
+        base = loadtest.stub_url(riot)
+        monkeypatch.setattr(utils, "PATCH_NOTES_URL", f"{base}/news/tags/patch-notes/")
+        monkeypatch.setattr(utils, "PATCH_DETAIL_URL", f"{base}/news/game-updates/patch-{{version}}-notes/")
+
+        assert utils.list_patch_versions(limit=3) == {"versions": ["25-2", "25-1"]}
+        utils.get_patch("25-2")
+        assert len(utils.parse_champions("25-2")["champions"]) == 30
+        assert utils.get_changes("25-2")["changes"]
+        assert requests.post(f"{base}/api/generate", json={}).json()["response"]
+    finally:
+        riot.shutdown()
+
+
+def test_failure_injection_and_load_report():
+    stub = loadtest.start_stub(loadtest.StubConfig(failure_rate=1.0), ["25-2", "25-1"])
+    try:
+        mix = {"/news/tags/patch-notes/": 1, "/news/game-updates/patch-{v}-notes/": 1}
+        report = loadtest.run_load(loadtest.stub_url(stub), mix, ["25-2", "25-1"], rate=100, duration=0.3)
+    finally:
+        stub.shutdown()
+    assert report["requests"] >= 20
+    assert set(report["endpoints"]) == set(mix)
+    assert all(s["error_rate"] == 1.0 for s in report["endpoints"].values())
+
+
+def test_queueing_behind_a_saturated_pool_counts_as_latency():
+    stub = loadtest.start_stub(loadtest.StubConfig(latency_ms=100), ["25-2", "25-1"])
+    try:
+        mix = {"/news/tags/patch-notes/": 1}
+        report = loadtest.run_load(loadtest.stub_url(stub), mix, ["25-2", "25-1"], rate=50, duration=0.4, concurrency=1)
+    finally:
+        stub.shutdown()
+    # One worker serves ~10 req/s at 100 ms each, so 20 requests queue for up to ~2 s
+    assert report["late"] > 10
+    assert report["endpoints"]["/news/tags/patch-notes/"]["p99_ms"] > 1000
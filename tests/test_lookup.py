@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+
+from backend import encoding, lookup, main, parsing
+
+
+def test_normalize_name_folds_case_accents_and_punctuation():
+    assert lookup.normalize_name("Kai'Sa") == "kaisa"
+    assert lookup.normalize_name("KAI SA") == "kaisa"
+    assert lookup.normalize_name("Kaï-Sa") == "kaisa"
+    assert lookup.normalize_name("Rabadon's Deathcap") == "rabadonsdeathcap"
+
+
+def test_find_entry_exact_prefix_fuzzy():
+    entries = {"Brand": "b", "Braum": "m", "Kai'Sa": "k"}
+    assert lookup.find_entry("t", "champions", entries, "kaisa")["match"] == "exact"
+
+    prefix = lookup.find_entry("t", "champions", entries, "bra")
+    assert prefix["match"] == "prefix"
+    assert (prefix["name"], prefix["alternatives"]) == ("Brand", ["Braum"])
+
+    fuzzy = lookup.find_entry("t", "champions", entries, "Kaisaa")
+    assert (fuzzy["match"], fuzzy["champions"]) == ("fuzzy", {"Kai'Sa": "k"})
+    assert lookup.find_entry("t", "champions", entries, "Zed") is None
+
+
+def test_lookup_endpoints(patch_archive, monkeypatch):
+    monkeypatch.setattr(parsing, "PARSE_WORKERS", 0)
+    monkeypatch.setattr(lookup, "_INDEX_CACHE", {})
+    monkeypatch.setattr(encoding, "_ENCODED_CACHE", encoding.OrderedDict())
+    client = TestClient(main.app)
+
+    champ = client.get("/champions/25-16/kaisa").json()
+    assert champ["name"] == "Kai'Sa"
+    assert champ["champions"] == {"Kai'Sa": "Lower base damage."}
+
+    item = client.get("/items/25-16/rabadon").json()
+    assert (item["match"], item["name"]) == ("prefix", "Rabadon's Deathcap")
+
+    assert client.get("/champions/25-16/Teemo").status_code == 404
+    assert client.get("/champions/25-16/KAISA").json()["name"] == "Kai'Sa"
+    assert encoding._ENCODED_CACHE == {}
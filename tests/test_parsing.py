@@ -0,0 +1,49 @@
+import asyncio
+import os
+import signal
+import time
+
+from fastapi.testclient import TestClient
+
+from backend import main, parsing, utils
+
+
+def test_cold_bundles_parse_in_process_pool(patch_archive, process_pool):
+    async def run():
+        # Two concurrent requests for the same version share one parse
+        a, b = await asyncio.gather(parsing.get_bundle("25-16"), parsing.get_bundle("25-16"))
+        await parsing.prefetch(["25-15", "25-16"])
+        return a, b
+
+    a, b = asyncio.run(run())
+    assert a is b
+    assert "Brand" in a["champions"]
+    assert set(utils._BUNDLE_CACHE) == {"25-15", "25-16"}
+    records = utils.get_change_records("25-16")
+    assert isinstance(records[0], utils.ChangeRecord)
+    assert parsing._INFLIGHT == {}
+
+
+def test_broken_pool_is_replaced(patch_archive, process_pool):
+    asyncio.run(parsing.get_bundle("25-15"))
+    broken = parsing._POOL
+    for pid in list(broken._processes):
+        os.kill(pid, signal.SIGKILL)
+    deadline = time.monotonic() + 10
+    while not broken._broken and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    bundle = asyncio.run(parsing.get_bundle("25-16"))
+    assert "Brand" in bundle["champions"]
+    assert parsing._POOL is not None and parsing._POOL is not broken
+
+
+def test_async_endpoints_serve_bundle_slices(patch_archive, monkeypatch):
+    monkeypatch.setattr(parsing, "PARSE_WORKERS", 0)
+    monkeypatch.setattr(utils, "find_patch_version", lambda: "25-16")
+    client = TestClient(main.app)
+
+    assert "Kai'Sa" in client.get("/champions/25-15").json()["champions"]
+    assert client.get("/tagline/").json() == {"tagline": "Patch 25-16: Brand gets hotter"}
+    assert client.get("/arena/25-16").json()["arena"]["Augments"] == ["Arena augments reworked"]
+    assert client.get("/changes/25-16", params={"direction": "nerf"}).json()["changes"][0]["entity"] == "Kai'Sa"
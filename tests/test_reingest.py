@@ -0,0 +1,76 @@
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from backend import parsing, revalidate, utils
+
+
+@pytest.fixture
+def riot(patch_archive, patch_html, process_pool, local_http_server, monkeypatch):
+    """Local article server honouring If-None-Match; `state["html"]` is the current article."""
+    state = {"html": patch_html("25-16"), "etag": '"v1"', "requests": []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["requests"].append(dict(self.headers))
+            if self.headers.get("If-None-Match") == state["etag"]:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = state["html"].encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("ETag", state["etag"])
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    monkeypatch.setattr(utils, "PATCH_DETAIL_URL", f"{local_http_server(Handler)}/{{version}}")
+    monkeypatch.setattr(revalidate.webhooks, "_DIGEST_CACHE", {})
+    return state
+
+
+def test_conditional_request_and_unchanged_content(riot):
+    assert revalidate.revalidate("25-16")["status"] == "unchanged"
+    assert revalidate.revalidate("25-16")["status"] == "not-modified"
+    assert riot["requests"][-1]["If-None-Match"] == '"v1"'
+
+
+def test_edited_section_only_reextracts_dependent_fields(riot):
+    revalidate.revalidate("25-16")
+    bundle, rows = utils.build_bundle("25-16")
+    utils.store_bundle("25-16", bundle, rows)
+    champions = utils._BUNDLE_CACHE["25-16"]["champions"]
+    revalidate.webhooks._DIGEST_CACHE["25-16"] = b"stale"
+
+    riot["html"] = riot["html"].replace("130 ⇒ 140", "130 ⇒ 145")
+    riot["etag"] = '"v2"'
+    result = revalidate.revalidate("25-16")
+
+    assert result["status"] == "updated"
+    assert parsing._POOL is not None  # re-extracted in the parse pool
+    assert result["sections"] == ["items"]
+    assert "champions" not in result["fields"] and "items" in result["fields"]
+    refreshed = utils._BUNDLE_CACHE["25-16"]
+    assert refreshed["champions"] is champions
+    ap = [c for c in utils.get_change_records("25-16") if c.stat == "Ability Power"]
+    assert ap[0].after == 145
+    assert len(utils.get_change_records("25-16")) == len(rows)
+    assert "25-16" not in revalidate.webhooks._DIGEST_CACHE
+
+
+def test_bugfix_only_edit_keeps_the_summary(riot, monkeypatch):
+    monkeypatch.setattr(utils, "_SUMMARY_CACHE", {})
+    revalidate.revalidate("25-16")
+    utils.store_bundle("25-16", *utils.build_bundle("25-16"))
+    utils._SUMMARY_CACHE["25-16"] = "Brand buffs."
+
+    riot["html"] = riot["html"].replace("Fixed a tooltip typo", "Fixed two tooltip typos")
+    riot["etag"] = '"v2"'
+    assert revalidate.revalidate("25-16")["sections"] == ["bugfixes"]
+    assert utils._SUMMARY_CACHE["25-16"] == "Brand buffs."
+
+    riot["html"] = riot["html"].replace("Lower base damage.", "Much lower base damage.")
+    riot["etag"] = '"v3"'
+    revalidate.revalidate("25-16")
+    assert "25-16" not in utils._SUMMARY_CACHE
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from backend import utils
+
+
+@pytest.fixture
+def summary_state(monkeypatch):
+    monkeypatch.setattr(utils, "_SUMMARY_CACHE", {})
+    monkeypatch.setattr(utils, "_SUMMARY_PENDING", set())
+    monkeypatch.setattr(utils, "_SUMMARY_FAILED_AT", {})
+
+
+def test_extractive_summary_is_short_and_names_top_changes(patch_archive):
+    utils.get_bundle("25-16")
+    t0 = time.perf_counter()
+    text = utils.summarize_extractive("25-16")
+    elapsed = time.perf_counter() - t0
+
+    assert text == "Brand buffs and Kai'Sa nerfs, Rabadon's Deathcap buffs, plus Arena updates."
+    assert len(text.split()) <= utils.SUMMARY_MAX_WORDS
+    assert elapsed < 0.01
+
+
+def test_get_summary_returns_extractive_then_llm(patch_archive, summary_state, monkeypatch):
+    release = threading.Event()
+
+    def slow_llm(version):
+        release.wait(5)
+        return {"summary": "Brand burns brighter."}
+
+    monkeypatch.setattr(utils, "generate_one_liner_summary", slow_llm)
+    first = utils.get_summary("25-16")
+    assert first["extractive"] is True and first["source"] == "extractive"
+    assert first["summary"]
+
+    release.set()
+    for _ in range(100):
+        if "25-16" in utils._SUMMARY_CACHE:
+            break
+        time.sleep(0.01)
+    assert utils.get_summary("25-16") == {"summary": "Brand burns brighter.", "source": "llm", "extractive": False}
+
+
+def test_unreachable_llm_degrades_to_extractive(patch_archive, summary_state, monkeypatch):
+    calls = []
+
+    def down(version):
+        calls.append(version)
+        return {"summary": None, "error": "ollama request failed: connection refused"}
+
+    monkeypatch.setattr(utils, "generate_one_liner_summary", down)
+    assert utils.get_summary("25-16")["extractive"] is True
+    for _ in range(100):
+        if "25-16" in utils._SUMMARY_FAILED_AT:
+            break
+        time.sleep(0.01)
+    # Within the retry window no further LLM calls are made
+    assert utils.get_summary("25-16")["extractive"] is True
+    assert calls == ["25-16"]
@@ -0,0 +1,133 @@
+import hashlib
+import hmac
+import json
+import socket
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main, webhooks
+
+
+@pytest.fixture
+def receiver(local_http_server):
+    """Local webhook receiver; fails the first `fail_first` requests with HTTP 503."""
+    state = {"bodies": [], "headers": [], "fail_first": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            if state["fail_first"] > 0:
+                state["fail_first"] -= 1
+                self.send_response(503)
+            else:
+                state["bodies"].append(body)
+                state["headers"].append(dict(self.headers))
+                self.send_response(204)
+            self.end_headers()
+
+    state["url"] = f"{local_http_server(Handler)}/hook"
+    return state
+
+
+@pytest.fixture
+def webhook_env(patch_archive, monkeypatch):
+    monkeypatch.setattr(webhooks, "WEBHOOK_STORE", str(patch_archive / "subscriptions.json"))
+    monkeypatch.setattr(webhooks, "WEBHOOK_BACKOFF", 0.0)
+    monkeypatch.setattr(webhooks, "WEBHOOK_ALLOW_PRIVATE", True)  # the receiver is on loopback
+    monkeypatch.setattr(webhooks, "_DIGEST_CACHE", {})
+    monkeypatch.setattr(webhooks.utils, "get_summary", lambda v: {"summary": "Brand buffs."})
+
+
+def test_new_version_pushes_signed_digest_once(webhook_env, receiver):
+    sub = webhooks.add_subscription(receiver["url"], secret="s3cret")
+    assert "secret" not in sub and "token_hash" not in sub
+
+    result = webhooks.notify_new_version("25-16")
+    assert result == {"delivered": 1, "failed": 0}
+    assert webhooks.notify_new_version("25-16") is None
+
+    body = receiver["bodies"][0]
+    digest = json.loads(body)
+    assert digest["version"] == "25-16"
+    assert digest["champions"][0]["name"] == "Brand"
+    assert digest["summary"] == "Brand buffs."
+    expected = hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+    assert receiver["headers"][0]["X-Signature-SHA256"] == expected
+
+
+def test_delivery_retries_then_records_failures(webhook_env, receiver, monkeypatch):
+    webhooks.add_subscription(receiver["url"])
+    receiver["fail_first"] = 1
+    assert webhooks.dispatch("25-16", b"{}") == {"delivered": 1, "failed": 0}
+
+    monkeypatch.setattr(webhooks, "WEBHOOK_RETRIES", 1)
+    receiver["fail_first"] = 5
+    assert webhooks.dispatch("25-16", b"{}") == {"delivered": 0, "failed": 1}
+    sub = webhooks.list_subscriptions()["subscriptions"][0]
+    assert sub["failures"] == 1 and sub["last_error"] == "HTTP 503"
+
+
+def test_private_targets_are_rejected(webhook_env, monkeypatch):
+    monkeypatch.setattr(webhooks, "WEBHOOK_ALLOW_PRIVATE", False)
+    for url in ("http://127.0.0.1:8000/hook", "http://10.0.0.5/hook", "http://169.254.169.254/latest", "ftp://x"):
+        with pytest.raises(ValueError):
+            webhooks.add_subscription(url)
+
+
+def test_delivery_connects_to_the_validated_address(webhook_env, receiver, monkeypatch):
+    """A host that re-resolves elsewhere after the check must not redirect the POST."""
+    real_getaddrinfo = socket.getaddrinfo
+    lookups = []
+
+    def rebinding(host, *args, **kwargs):
+        if host != "hook.test":
+            return real_getaddrinfo(host, *args, **kwargs)
+        lookups.append(host)
+        ip = "127.0.0.1" if len(lookups) % 2 else "203.0.113.9"
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (ip, 0))]
+
+    monkeypatch.setattr(socket, "getaddrinfo", rebinding)
+    port = receiver["url"].split(":")[2].split("/")[0]
+    webhooks.add_subscription(f"http://hook.test:{port}/hook")
+    lookups.clear()
+
+    assert webhooks.dispatch("25-16", b"{}") == {"delivered": 1, "failed": 0}
+    assert lookups == ["hook.test"]
+    assert receiver["headers"][0]["Host"] == f"hook.test:{port}"
+
+
+def test_listing_masks_urls_and_delete_needs_token(webhook_env, monkeypatch):
+    url = "http://127.0.0.1:9/api/webhooks/123/very-secret-token"
+    sub = webhooks.add_subscription(url)
+    assert sub["url"] == "http://127.0.0.1:9/***"
+    assert "token" not in webhooks.add_subscription(url)
+
+    client = TestClient(main.app)
+    assert client.get("/subscriptions/").status_code == 403
+    monkeypatch.setattr(webhooks, "WEBHOOK_ADMIN_TOKEN", "admin")
+    listed = client.get("/subscriptions/", headers={"X-Admin-Token": "admin"}).json()
+    assert "very-secret-token" not in json.dumps(listed)
+
+    assert client.delete(f"/subscriptions/{sub['id']}").status_code == 404
+    assert client.delete(f"/subscriptions/{sub['id']}", headers={"X-Subscription-Token": "guess"}).status_code == 404
+    resp = client.delete(f"/subscriptions/{sub['id']}", headers={"X-Subscription-Token": sub["token"]})
+    assert resp.json() == {"deleted": sub["id"]}
+
+
+def test_failed_digest_is_not_marked_sent(webhook_env, receiver, monkeypatch):
+    webhooks.add_subscription(receiver["url"])
+
+    def broken(v):
+        raise RuntimeError("parse failed")
+
+    build_digest = webhooks.build_digest
+    monkeypatch.setattr(webhooks, "build_digest", broken)
+    with pytest.raises(RuntimeError):
+        webhooks.notify_new_version("25-16")
+    assert webhooks._load_store().get("last_version") is None
+
+    monkeypatch.setattr(webhooks, "build_digest", build_digest)
+    assert webhooks.notify_new_version("25-16") == {"delivered": 1, "failed": 0}
+    assert webhooks._load_store()["last_version"] == "25-16"